@@ -1,6 +1,16 @@
+import os
+import sys
+import time
 import tkinter as tk
 from tkinter import messagebox
 import math
+from evaluator import AsyncEvaluator, OK, ZERO_DIVISION, TIMEOUT
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from telemetry import Telemetry  # noqa: E402
+
+PREVIEW_DELAY_MS = 250  # пауза после ввода перед предпросмотром
+POLL_MS = 20            # опрос процесса-вычислителя
 
 
 class Calculator:
@@ -9,33 +19,46 @@ class Calculator:
         self.root.title("Простой Калькулятор")
         self.root.geometry("300x400")
 
+        self.evaluator = AsyncEvaluator()
+        # Процесс-вычислитель запускается после показа окна, чтобы не задерживать его
+        self.root.after_idle(self.evaluator.start)
+        self.telemetry = Telemetry.from_env("calculator")
+        self._preview_job = None
+        self._poll_job = None
+
         vcmd = (root.register(self.validate_input), "%S", "%P")
 
+        self.text = tk.StringVar()
+        self.text.trace_add("write", lambda *_: self._schedule_preview())
         self.entry = tk.Entry(
             root,
             font=("Arial", 20),
             justify="right",
+            textvariable=self.text,
             validate="key",
             validatecommand=vcmd,
         )
-        self.entry.grid(row=0, column=0, columnspan=4, padx=10, pady=10, sticky="we")
+        self.entry.grid(row=0, column=0, columnspan=4, padx=10, pady=(10, 0), sticky="we")
+
+        self.preview = tk.Label(root, font=("Arial", 12), fg="gray", anchor="e")
+        self.preview.grid(row=1, column=0, columnspan=4, padx=10, sticky="we")
 
         buttons = [
-            ("7", 1, 0),
-            ("8", 1, 1),
-            ("9", 1, 2),
-            ("/", 1, 3),
-            ("4", 2, 0),
-            ("5", 2, 1),
-            ("6", 2, 2),
-            ("*", 2, 3),
-            ("1", 3, 0),
-            ("2", 3, 1),
-            ("3", 3, 2),
-            ("-", 3, 3),
-            ("0", 4, 0),
-            (".", 4, 1),
-            ("+", 4, 2),
+            ("7", 2, 0),
+            ("8", 2, 1),
+            ("9", 2, 2),
+            ("/", 2, 3),
+            ("4", 3, 0),
+            ("5", 3, 1),
+            ("6", 3, 2),
+            ("*", 3, 3),
+            ("1", 4, 0),
+            ("2", 4, 1),
+            ("3", 4, 2),
+            ("-", 4, 3),
+            ("0", 5, 0),
+            (".", 5, 1),
+            ("+", 5, 2),
         ]
 
         for text, row, col in buttons:
@@ -48,19 +71,21 @@ class Calculator:
 
         tk.Button(
             root, text="=", font=("Arial", 15), bg="lightblue", command=self.calculate
-        ).grid(row=4, column=3, sticky="nsew", padx=2, pady=2)
+        ).grid(row=5, column=3, sticky="nsew", padx=2, pady=2)
         tk.Button(
             root, text="C", font=("Arial", 15), bg="red", fg="white", command=self.clear
-        ).grid(row=5, column=0, columnspan=2, sticky="nsew", padx=2, pady=2)
+        ).grid(row=6, column=0, columnspan=2, sticky="nsew", padx=2, pady=2)
         tk.Button(root, text="√", font=("Arial", 15), command=self.sqrt).grid(
-            row=5, column=2, columnspan=2, sticky="nsew", padx=2, pady=2
+            row=6, column=2, columnspan=2, sticky="nsew", padx=2, pady=2
         )
 
         for i in range(4):
             root.grid_columnconfigure(i, weight=1)
-        for i in range(6):
+        for i in range(2, 7):
             root.grid_rowconfigure(i, weight=1)
 
+        root.protocol("WM_DELETE_WINDOW", self.close)
+
     def validate_input(self, char, new_value):
         allowed = "0123456789.+-*/"
         if new_value == "":
@@ -71,20 +96,79 @@ class Calculator:
         self.entry.insert(tk.END, value)
 
     def clear(self):
+        self.evaluator.cancel()
         self.entry.delete(0, tk.END)
 
     def calculate(self):
+        # Вычисление идёт в отдельном процессе; результат придёт в _show_result
         expression = self.entry.get()
-        try:
-            result = eval(expression)
+        self._cancel_preview()
+        self.evaluator.cancel()
+        started = time.perf_counter()
+        self.evaluator.submit(expression,
+                              lambda status, value: self._show_result(expression, started, status, value))
+        self._start_polling()
+
+    def _show_result(self, expression, started, status, value):
+        # Задержка от нажатия "=" до результата, включая обмен с процессом
+        self.telemetry.record("calculate", time.perf_counter() - started)
+        self.telemetry.count(f"calculate_{status}")
+        if self.entry.get() != expression:
+            return  # поле изменили, пока шло вычисление
+        if status == OK:
             self.entry.delete(0, tk.END)
-            self.entry.insert(0, str(result))
-        except ZeroDivisionError:
+            self.entry.insert(0, str(value))
+            return
+        if status == ZERO_DIVISION:
             messagebox.showerror("Ошибка", "На ноль делить нельзя!")
-            self.clear()
-        except Exception:
-            messagebox.showerror("Ошибка", "Некорректное выражение")
-            self.clear()
+        elif status == TIMEOUT:
+            messagebox.showerror("Ошибка", "Вычисление заняло слишком много времени")
+        else:
+            messagebox.showerror("Ошибка", value)
+        self.clear()
+
+    def _schedule_preview(self):
+        self._cancel_preview()
+        self._preview_job = self.root.after(PREVIEW_DELAY_MS, self._update_preview)
+
+    def _cancel_preview(self):
+        if self._preview_job is not None:
+            self.root.after_cancel(self._preview_job)
+            self._preview_job = None
+        self.preview.config(text="")
+
+    def _update_preview(self):
+        self._preview_job = None
+        expression = self.entry.get().strip()
+        # Одно число или незаконченное выражение показывать незачем
+        if not expression or expression[-1] in "+-*/." or not any(c in "+-*/" for c in expression.lstrip("+-")):
+            return
+        started = time.perf_counter()
+        self.evaluator.submit(expression,
+                              lambda status, value: self._show_preview(expression, started, status, value))
+        self._start_polling()
+
+    def _show_preview(self, expression, started, status, value):
+        self.telemetry.record("preview", time.perf_counter() - started)
+        if self.entry.get().strip() != expression:
+            return
+        if status == OK:
+            self.preview.config(text=f"= {value}")
+        elif status == TIMEOUT:
+            self.preview.config(text="слишком долгое вычисление")
+
+    def _start_polling(self):
+        if self._poll_job is None and self.evaluator.busy:
+            self._poll_job = self.root.after(POLL_MS, self._poll)
+
+    def _poll(self):
+        self._poll_job = None
+        self.evaluator.poll()
+        self._start_polling()
+
+    def close(self):
+        self.evaluator.close()
+        self.root.destroy()
 
     def sqrt(self):
         try:
@@ -0,0 +1,157 @@
+"""
+Пакетное вычисление выражений без графического интерфейса.
+
+Два режима:
+
+    выражения из файла (по одному на строку) вычисляются в пуле процессов,
+    результат — CSV "выражение,результат":
+        python batch_calc.py expressions.txt -o results.csv
+
+    таблица "что если": каждое выражение вычисляется векторно по диапазону
+    значений переменной, результат — CSV с колонкой переменной и колонкой
+    на каждое выражение:
+        python batch_calc.py -e "x**2 + 1" -e "1/x" --var x --range 0 1000000
+
+Пустые строки и строки, начинающиеся с #, в файле пропускаются.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from expression import compile_expression, evaluate, evaluate_array, ExpressionError
+
+# Меньшие объёмы быстрее посчитать в текущем процессе, чем запускать пул
+PARALLEL_THRESHOLD = 10_000
+BLOCK_SIZE = 5_000
+
+
+def _evaluate_line(text: str) -> str:
+    try:
+        return str(evaluate(text))
+    except ZeroDivisionError:
+        return "Ошибка: деление на ноль"
+    except ExpressionError as e:
+        return f"Ошибка: {e}"
+
+
+def _evaluate_block(lines: list[str]) -> list[str]:
+    return [_evaluate_line(text) for text in lines]
+
+
+def _evaluate_slice(expressions: list[str], name: str, start: float, step: float,
+                    first: int, last: int):
+    # Значения считаются по номерам [first, last), чтобы части стыковались без повторов
+    import numpy as np
+
+    values = start + np.arange(first, last) * step
+    return values, [evaluate_array(text, name, values) for text in expressions]
+
+
+def evaluate_lines(lines: list[str], workers: int | None = None) -> list[str]:
+    """Вычисляет выражения по одному; большие списки — блоками в пуле процессов."""
+    workers = workers or os.cpu_count() or 1
+    if len(lines) < PARALLEL_THRESHOLD or workers == 1:
+        return _evaluate_block(lines)
+    blocks = [lines[i:i + BLOCK_SIZE] for i in range(0, len(lines), BLOCK_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [result for block in pool.map(_evaluate_block, blocks) for result in block]
+
+
+def evaluate_table(expressions: list[str], name: str, start: float, stop: float,
+                   step: float = 1, workers: int | None = None):
+    """
+    Вычисляет выражения по диапазону [start, stop) с шагом step.
+
+    Диапазон делится на части по числу процессов; каждая часть считается
+    векторно. Возвращает (значения переменной, [массив на каждое выражение]).
+
+    Raises:
+        ExpressionError: если выражение некорректно или использует другие переменные.
+        ValueError: если step равен нулю.
+    """
+    import numpy as np
+
+    if step == 0:
+        raise ValueError("Шаг диапазона не может быть нулевым")
+    for text in expressions:
+        unknown = compile_expression(text.strip()).variables - {name}
+        if unknown:
+            raise ExpressionError(f"Не задана переменная: {min(unknown)} (в выражении {text})")
+
+    count = max(0, int(np.ceil((stop - start) / step)))
+    workers = workers or os.cpu_count() or 1
+    if count < PARALLEL_THRESHOLD or workers == 1:
+        return _evaluate_slice(expressions, name, start, step, 0, count)
+
+    per_worker = -(-count // workers)
+    bounds = [(first, min(count, first + per_worker)) for first in range(0, count, per_worker)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(_evaluate_slice, *zip(*[(expressions, name, start, step, first, last)
+                                                      for first, last in bounds])))
+    values = np.concatenate([part[0] for part in parts])
+    columns = [np.concatenate([part[1][k] for part in parts]) for k in range(len(expressions))]
+    return values, columns
+
+
+def _read_expressions(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетное вычисление выражений")
+    parser.add_argument("file", nargs="?", help="файл с выражениями, по одному на строку")
+    parser.add_argument("-e", "--expression", action="append", default=[],
+                        help="выражение (можно указать несколько раз)")
+    parser.add_argument("--var", help="имя переменной для режима таблицы")
+    parser.add_argument("--range", type=float, nargs="+", metavar="N",
+                        help="START STOP [STEP] — значения переменной")
+    parser.add_argument("-o", "--output", help="файл CSV (по умолчанию stdout)")
+    parser.add_argument("--workers", type=int, help="число процессов (по умолчанию — по числу ядер)")
+    args = parser.parse_args()
+
+    expressions = list(args.expression)
+    if args.file:
+        expressions += _read_expressions(args.file)
+    if not expressions:
+        parser.error("укажите файл с выражениями или -e")
+    if (args.var is None) != (args.range is None):
+        parser.error("--var и --range указываются вместе")
+    if args.range is not None and len(args.range) not in (2, 3):
+        parser.error("--range принимает START STOP [STEP]")
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        writer = csv.writer(out)
+        start_time = time.perf_counter()
+        if args.var is None:
+            results = evaluate_lines(expressions, args.workers)
+            count = len(results)
+            elapsed = time.perf_counter() - start_time
+            writer.writerow(("expression", "result"))
+            writer.writerows(zip(expressions, results))
+        else:
+            try:
+                values, columns = evaluate_table(expressions, args.var, *args.range,
+                                                 workers=args.workers)
+            except ZeroDivisionError:
+                parser.exit(1, "Ошибка: деление на ноль\n")
+            except (ExpressionError, ValueError) as e:
+                parser.exit(1, f"Ошибка: {e}\n")
+            count = len(values) * len(columns)
+            elapsed = time.perf_counter() - start_time
+            writer.writerow((args.var, *expressions))
+            writer.writerows(zip(values.tolist(), *(column.tolist() for column in columns)))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"Вычислено: {count} за {elapsed:.3f} с ({rate:,.0f} в секунду)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
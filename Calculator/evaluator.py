@@ -0,0 +1,161 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from expression import evaluate, ExpressionError
+
+EVAL_TIMEOUT = 2.0      # секунд на одно выражение
+MEMO_SIZE = 1024
+
+# Коды результата, передаваемые в callback(status, value)
+OK, ZERO_DIVISION, ERROR, TIMEOUT = "ok", "zero", "error", "timeout"
+
+Callback = Callable[[str, object], None]
+
+
+def _worker(conn):
+    # Выполняется в отдельном процессе: получает (id, текст), отвечает (id, статус, значение)
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        req_id, text = request
+        try:
+            conn.send((req_id, OK, evaluate(text)))
+        except ZeroDivisionError:
+            conn.send((req_id, ZERO_DIVISION, None))
+        except ExpressionError as e:
+            conn.send((req_id, ERROR, str(e)))
+        except Exception:
+            conn.send((req_id, ERROR, "Некорректное выражение"))
+
+
+class AsyncEvaluator:
+    """
+    Вычисляет выражения в отдельном процессе с жёстким таймаутом.
+
+    Одновременно выполняется одно выражение; из ожидающих хранится только
+    последнее (более старые запросы предпросмотра просто отбрасываются).
+    Зависший процесс по таймауту убивается и перезапускается. Результаты
+    запоминаются по тексту выражения, так что повтор ничего не стоит.
+
+    Объект не знает о Tk: владелец периодически вызывает poll(), пока busy.
+    Процесс запускается вызовом start() или при первом запросе.
+    """
+
+    def __init__(self, timeout: float = EVAL_TIMEOUT, memo_size: int = MEMO_SIZE):
+        self.timeout = timeout
+        self.memo_size = memo_size
+        self._memo: OrderedDict[str, tuple[str, object]] = OrderedDict()
+        self._ctx = None
+        self._process = None
+        self._conn = None
+        self._next_id = 0
+        # (id, текст, callback или None, время отправки)
+        self._running: tuple | None = None
+        self._pending: tuple[str, Callback] | None = None
+
+    @property
+    def busy(self) -> bool:
+        return self._running is not None or self._pending is not None
+
+    def start(self):
+        """Запускает процесс-вычислитель, если он ещё не запущен."""
+        if self._process is None:
+            self._start_worker()
+
+    def submit(self, text: str, callback: Callback):
+        """Ставит выражение в очередь; при попадании в кэш callback вызывается сразу."""
+        cached = self._memo.get(text)
+        if cached is not None:
+            self._memo.move_to_end(text)
+            callback(*cached)
+            return
+        self._pending = (text, callback)
+        self._dispatch()
+
+    def cancel(self):
+        """Отменяет ожидающий запрос; результат уже выполняемого будет проигнорирован."""
+        self._pending = None
+        if self._running is not None:
+            req_id, text, _, started = self._running
+            self._running = (req_id, text, None, started)
+
+    def poll(self):
+        """Забирает готовый результат и проверяет таймаут."""
+        if self._running is None:
+            self._dispatch()
+            return
+
+        req_id, text, callback, started = self._running
+        if self._conn.poll():
+            try:
+                resp_id, status, value = self._conn.recv()
+            except (EOFError, OSError):
+                self._restart()
+                self._finish(callback, ERROR, "Вычислитель недоступен")
+                return
+            if resp_id == req_id:
+                self._remember(text, (status, value))
+                self._finish(callback, status, value)
+        elif time.monotonic() - started > self.timeout:
+            self._restart()
+            self._finish(callback, TIMEOUT, None)
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+            self._conn.close()
+        if self._process is not None:
+            self._process.join(timeout=0.2)
+            if self._process.is_alive():
+                self._process.kill()
+        self._process = self._conn = None
+
+    def _finish(self, callback: Callback | None, status: str, value):
+        self._running = None
+        if callback is not None:
+            callback(status, value)
+        self._dispatch()
+
+    def _dispatch(self):
+        if self._running is not None or self._pending is None:
+            return
+        text, callback = self._pending
+        self._pending = None
+        cached = self._memo.get(text)
+        if cached is not None:
+            callback(*cached)
+            return
+        self.start()
+        self._next_id += 1
+        self._conn.send((self._next_id, text))
+        self._running = (self._next_id, text, callback, time.monotonic())
+
+    def _remember(self, text: str, result: tuple[str, object]):
+        self._memo[text] = result
+        if len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+    def _start_worker(self):
+        if self._ctx is None:
+            import multiprocessing as mp
+            self._ctx = mp.get_context("spawn")
+        self._conn, child = self._ctx.Pipe()
+        self._process = self._ctx.Process(target=_worker, args=(child,), daemon=True)
+        self._process.start()
+        child.close()
+
+    def _restart(self):
+        if self._process is not None:
+            self._process.kill()
+            self._process.join()
+        if self._conn is not None:
+            self._conn.close()
+        self._start_worker()
@@ -0,0 +1,285 @@
+import math
+import operator
+import re
+from functools import lru_cache
+
+# Ограничения стоимости вычислений
+MAX_LENGTH = 256            # символов во входной строке
+MAX_LITERAL_DIGITS = 100    # цифр в одном числе
+MAX_RESULT_BITS = 3322      # ~1000 десятичных цифр у целого результата
+MAX_DEPTH = 100             # вложенность скобок и унарных знаков
+
+CACHE_SIZE = 512
+
+_TOKEN = re.compile(r"\s*(?:(\d+\.?\d*|\.\d+)|([A-Za-z_]\w*)|(\*\*|//|[-+*/%()]))")
+
+
+class ExpressionError(ValueError):
+    """Некорректное или слишком дорогое выражение."""
+
+
+class Name(str):
+    """Имя переменной в списке токенов (в отличие от оператора)."""
+
+
+def _check_bits(value):
+    if isinstance(value, int) and value.bit_length() > MAX_RESULT_BITS:
+        raise ExpressionError("Слишком большое число")
+    return value
+
+
+def _mul(a, b):
+    if isinstance(a, int) and isinstance(b, int) \
+            and a.bit_length() + b.bit_length() > MAX_RESULT_BITS + 1:
+        raise ExpressionError("Слишком большое число")
+    return a * b
+
+
+def _pow(base, exp):
+    # Заведомо огромные степени отсекаются по оценке до вычисления,
+    # пограничные — тем же точным правилом, что и остальные операции
+    if isinstance(base, int) and isinstance(exp, int) and exp > 0 and abs(base) > 1:
+        if exp * math.log2(abs(base)) > MAX_RESULT_BITS + 1:
+            raise ExpressionError("Слишком большая степень")
+    try:
+        result = base ** exp
+    except OverflowError:
+        raise ExpressionError("Слишком большая степень") from None
+    if isinstance(result, complex):
+        raise ExpressionError("Результат не является действительным числом")
+    if isinstance(result, int) and result.bit_length() > MAX_RESULT_BITS:
+        raise ExpressionError("Слишком большая степень")
+    return result
+
+
+def _add(a, b):
+    return _check_bits(a + b)
+
+
+def _sub(a, b):
+    return _check_bits(a - b)
+
+
+BINARY_OPS = {
+    "+": _add,
+    "-": _sub,
+    "*": _mul,
+    "/": operator.truediv,
+    "//": operator.floordiv,
+    "%": operator.mod,
+    "**": _pow,
+}
+
+UNARY_OPS = {
+    "-": operator.neg,
+    "+": operator.pos,
+}
+
+
+def tokenize(text: str) -> list[str | int | float]:
+    """Разбивает выражение на числа, имена переменных и операторы."""
+    if len(text) > MAX_LENGTH:
+        raise ExpressionError("Слишком длинное выражение")
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m:
+            raise ExpressionError(f"Недопустимый символ: {text[pos:].lstrip()[:1]!r}")
+        number, name, op = m.groups()
+        if number is not None:
+            if len(number) - ("." in number) > MAX_LITERAL_DIGITS:
+                raise ExpressionError("Слишком длинное число")
+            tokens.append(float(number) if "." in number else int(number))
+        elif name is not None:
+            tokens.append(Name(name))
+        else:
+            tokens.append(op)
+        pos = m.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Рекурсивный спуск с приоритетами как в Python:
+
+        expr  := term (("+" | "-") term)*
+        term  := unary (("*" | "/" | "//" | "%") unary)*
+        unary := ("+" | "-") unary | power
+        power := atom ("**" unary)?
+        atom  := NUMBER | NAME | "(" expr ")"
+
+    Строит постфиксный байткод: ("push", значение), ("load", имя),
+    ("unary", op), ("binary", op).
+    Подвыражения из констант сворачиваются сразу, с проверкой стоимости
+    перед каждой операцией.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.depth = 0
+
+    def parse(self) -> list[tuple]:
+        if not self.tokens:
+            raise ExpressionError("Пустое выражение")
+        code = self.expr()
+        if self.pos != len(self.tokens):
+            raise ExpressionError(f"Неожиданный символ: {self.tokens[self.pos]}")
+        return code
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expr(self):
+        code = self.term()
+        while self.peek() in ("+", "-"):
+            code = self.binary(self.take(), code, self.term())
+        return code
+
+    def term(self):
+        code = self.unary()
+        while self.peek() in ("*", "/", "//", "%"):
+            code = self.binary(self.take(), code, self.unary())
+        return code
+
+    def unary(self):
+        if self.peek() in ("+", "-"):
+            op = self.take()
+            self.enter()
+            operand = self.unary()
+            self.depth -= 1
+            if len(operand) == 1 and operand[0][0] == "push":
+                return [("push", UNARY_OPS[op](operand[0][1]))]
+            return operand + [("unary", op)]
+        return self.power()
+
+    def power(self):
+        code = self.atom()
+        if self.peek() == "**":
+            self.take()
+            self.enter()
+            exponent = self.unary()
+            self.depth -= 1
+            code = self.binary("**", code, exponent)
+        return code
+
+    def atom(self):
+        token = self.take()
+        if token is None:
+            raise ExpressionError("Выражение оборвано")
+        if isinstance(token, Name):
+            return [("load", str(token))]
+        if isinstance(token, (int, float)):
+            return [("push", token)]
+        if token == "(":
+            self.enter()
+            code = self.expr()
+            self.depth -= 1
+            if self.take() != ")":
+                raise ExpressionError("Нет закрывающей скобки")
+            return code
+        raise ExpressionError(f"Неожиданный символ: {token}")
+
+    def enter(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise ExpressionError("Слишком глубокая вложенность")
+
+    @staticmethod
+    def binary(op, left, right):
+        if len(left) == 1 and len(right) == 1 and left[0][0] == right[0][0] == "push":
+            return [("push", BINARY_OPS[op](left[0][1], right[0][1]))]
+        return left + right + [("binary", op)]
+
+
+class Expression:
+    """
+    Скомпилированное выражение: постфиксный байткод для стековой машины.
+
+    Значениями переменных могут быть числа или массивы NumPy: операции
+    применяются поэлементно, так что одно выражение вычисляется сразу
+    для всего массива (см. evaluate_array).
+    """
+
+    __slots__ = ("source", "code", "variables")
+
+    def __init__(self, source: str, code: list[tuple]):
+        self.source = source
+        self.code = tuple((kind, BINARY_OPS[arg] if kind == "binary" else
+                           UNARY_OPS[arg] if kind == "unary" else arg)
+                          for kind, arg in code)
+        self.variables = frozenset(arg for kind, arg in code if kind == "load")
+
+    @property
+    def is_constant(self) -> bool:
+        return len(self.code) == 1 and self.code[0][0] == "push"
+
+    def evaluate(self, variables: dict | None = None):
+        if self.is_constant:
+            return self.code[0][1]
+        missing = self.variables - set(variables or ())
+        if missing:
+            raise ExpressionError(f"Не задана переменная: {min(missing)}")
+        stack = []
+        try:
+            for kind, arg in self.code:
+                if kind == "push":
+                    stack.append(arg)
+                elif kind == "load":
+                    stack.append(variables[arg])
+                elif kind == "unary":
+                    stack.append(arg(stack.pop()))
+                else:
+                    right = stack.pop()
+                    stack.append(arg(stack.pop(), right))
+        except OverflowError:
+            raise ExpressionError("Слишком большое число") from None
+        return stack[0]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(text: str) -> Expression:
+    """
+    Компилирует выражение с кэшированием.
+
+    Raises:
+        ExpressionError: если выражение некорректно или превышает ограничения.
+        ZeroDivisionError: если при свёртке констант встретилось деление на ноль.
+    """
+    try:
+        return Expression(text, _Parser(tokenize(text)).parse())
+    except OverflowError:
+        raise ExpressionError("Слишком большое число") from None
+
+
+def evaluate(text: str, **variables):
+    """Вычисляет арифметическое выражение без eval()."""
+    return compile_expression(text.strip()).evaluate(variables)
+
+
+def evaluate_array(text: str, name: str, values):
+    """
+    Вычисляет выражение сразу для всех значений переменной name.
+
+    values — массив NumPy, range или любая последовательность чисел; значения
+    приводятся к float64, поэтому переполнение даёт inf, а не молча
+    обрезанные целые. Деление на ноль и корень из отрицательного числа
+    дают inf/nan в соответствующих элементах, а не исключение.
+
+    Returns:
+        numpy.ndarray той же длины, что и values.
+    """
+    import numpy as np
+
+    expression = compile_expression(text.strip())
+    array = np.asarray(values, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        result = expression.evaluate({name: array})
+    return np.broadcast_to(np.asarray(result, dtype=np.float64), array.shape).copy()
@@ -1,12 +1,23 @@
+import os
+import sys
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
-import matplotlib.pyplot as plt
 import statistics
-import numpy as np
-from fastq_reader import FastqReader
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prewarm import prewarm  # noqa: E402
+from telemetry import Telemetry  # noqa: E402
+from fastq_reader import FastqReader  # noqa: E402
+from profiler import Profiler  # noqa: E402
 
 MAX_READS = 3000
 
+# Если задан, после каждого профилированного запуска сюда пишется trace-файл
+TRACE_FILE = os.environ.get("FASTQC_TRACE")
+
+# Задержка фоновой предзагрузки matplotlib и numpy после показа окна
+PREWARM_DELAY_MS = 500
+
 
 class FastQCApp:
     def __init__(self, root):
@@ -30,6 +41,17 @@ class FastQCApp:
         self.progress = ttk.Progressbar(root, length=300)
         self.progress.pack(pady=5)
 
+        # Профилирование этапов; при включённой телеметрии (GUI_TELEMETRY)
+        # профилировщик работает всегда и передаёт ей итоги каждого файла
+        self.telemetry = Telemetry.from_env("fastq")
+        self.profiler = Profiler(telemetry=self.telemetry)
+        self.profile_var = tk.BooleanVar(value=bool(TRACE_FILE))
+        tk.Checkbutton(root, text="Профилирование", variable=self.profile_var).pack()
+        self.perf_status = tk.Label(root, text="", fg="gray")
+        self.perf_status.pack(pady=5)
+
+        prewarm(self.root, ("numpy", "matplotlib.pyplot"), PREWARM_DELAY_MS)
+
     def open_file(self):
         path = filedialog.askopenfilename(
             filetypes=[("FASTQ", "*.fastq *.fq *.fastq.gz *.fq.gz")]
@@ -42,9 +64,13 @@ class FastQCApp:
 
         reads = []
         self.progress["value"] = 0
+        self.perf_status.config(text="")
+
+        if self.profile_var.get() or self.telemetry.enabled:
+            self.profiler.start()
 
         try:
-            with FastqReader(path) as reader:
+            with FastqReader(path, profiler=self.profiler) as reader:
                 for i, record in enumerate(reader.read()):
                     reads.append(record)
 
@@ -59,8 +85,22 @@ class FastQCApp:
             self.draw_graphs(reads)
 
         except Exception as e:
+            self.profiler.stop()
             messagebox.showerror("Ошибка", str(e))
 
+    def _finish_profiling(self):
+        """
+        Останавливает профилировщик, выводит сводку в строку статуса
+        и при необходимости сохраняет trace-файл.
+        """
+        if not self.profiler.enabled:
+            return
+        self.profiler.stop()
+        if self.profile_var.get():
+            self.perf_status.config(text=self.profiler.summary())
+        if TRACE_FILE:
+            self.profiler.write_trace(TRACE_FILE)
+
     def draw_graphs(self, reads):
         """
         Построение графиков FastQC:
@@ -69,9 +109,28 @@ class FastQCApp:
         3. sequence length distribution
         """
         if not reads:
+            self.profiler.stop()
             messagebox.showwarning("Нет данных", "Невозможно построить графики — нет данных")
             return
 
+        with self.profiler.stage("aggregate"):
+            stats = self._aggregate(reads)
+
+        with self.profiler.stage("plot"):
+            fig = self._plot(*stats)
+            fig.canvas.draw()
+        self.profiler.count("files")
+
+        self._finish_profiling()
+        import matplotlib.pyplot as plt
+        plt.show()
+
+    def _aggregate(self, reads):
+        """
+        Подсчёт среднего качества, состава оснований по позициям и длин ридов.
+        """
+        import numpy as np
+
         # Извлечение данных
         lengths = [len(r.sequence) for r in reads]
         max_len = max(lengths)
@@ -123,6 +182,16 @@ class FastQCApp:
         perc_G_array = np.array(perc_G)
         perc_T_array = np.array(perc_T)
 
+        return (lengths, positions, mean_quality_array,
+                perc_A_array, perc_C_array, perc_G_array, perc_T_array)
+
+    def _plot(self, lengths, positions, mean_quality_array,
+              perc_A_array, perc_C_array, perc_G_array, perc_T_array):
+        """
+        Отрисовка трёх графиков FastQC по агрегированным данным.
+        """
+        import matplotlib.pyplot as plt
+
         fig = plt.figure(figsize=(12, 10))
 
         # 1 Per base sequence quality
@@ -153,8 +222,8 @@ class FastQCApp:
         ax3.set_xlabel("Read length")
         ax3.set_ylabel("Count")
 
-        plt.tight_layout()
-        plt.show()
+        fig.tight_layout()
+        return fig
 
 
 if __name__ == "__main__":
@@ -1,9 +1,13 @@
 from pathlib import Path
-from typing import Iterator
+from typing import Iterator, TYPE_CHECKING
 import gzip
+import time
 from abstract import SequenceReader
 from record import SequenceRecord
 
+if TYPE_CHECKING:
+    from profiler import Profiler
+
 
 class FastqReader(SequenceReader):
     """
@@ -16,17 +20,23 @@ class FastqReader(SequenceReader):
     Attributes:
         filepath (Path): Путь к FASTQ-файлу (может быть сжатым).
         file (file object or None): Открытый файловый дескриптор (обычный или gzip).
+        profiler (Profiler or None): Профилировщик этапов чтения; None — без замеров.
     """
 
-    def __init__(self, filepath: str | Path):
+    def __init__(self, filepath: str | Path, profiler: "Profiler | None" = None):
         """
         Инициализирует FastqReader с указанным путём к файлу.
 
         Args:
             filepath (str | Path): Путь к FASTQ-файлу. Поддерживается сжатие (.gz).
+            profiler (Profiler | None, optional): Профилировщик, в который
+                записываются время этапов "read" (чтение и распаковка), "parse"
+                (проверка формата), "quality" (декодирование Phred) и счётчики
+                "bytes" / "records". По умолчанию None.
         """
         super().__init__(filepath)
         self.file = None
+        self.profiler = profiler
 
     def __enter__(self):
         """
@@ -95,7 +105,16 @@ class FastqReader(SequenceReader):
             else:
                 self.file = open(self.filepath, "r", encoding="ascii")
 
+        prof = self.profiler
+        timed = prof is not None and prof.enabled
+        clock = time.perf_counter
+        if timed:
+            prof.count("bytes_on_disk", self.filepath.stat().st_size)
+
         while True:
+            if timed:
+                t_read = clock()
+
             header = self.file.readline()
             if not header:
                 break
@@ -107,6 +126,11 @@ class FastqReader(SequenceReader):
             if not (header and sequence and plus_line and quality):
                 break
 
+            if timed:
+                t_parse = clock()
+                prof.add_time("read", t_parse - t_read)
+                prof.count("bytes", len(header) + len(sequence) + len(plus_line) + len(quality) + 2)
+
             if not header.startswith("@"):
                 raise ValueError(f"Invalid FASTQ: expected '@', got {header.strip()!r}")
             if not plus_line.startswith("+"):
@@ -123,8 +147,15 @@ class FastqReader(SequenceReader):
             if not seq_clean:
                 raise ValueError(f"Empty sequence for {seq_id}")
 
+            if timed:
+                t_quality = clock()
+                prof.add_time("parse", t_quality - t_parse)
+
             quality_scores = self._parse_quality(qual_clean)
 
+            if timed:
+                prof.add_time("quality", clock() - t_quality)
+                prof.count("records")
 
             record = SequenceRecord(id=seq_id, sequence=seq_clean, quality=quality_scores)
             yield record
@@ -0,0 +1,224 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from telemetry import Telemetry
+
+
+_NULL_STAGE = nullcontext()
+
+
+class Profiler:
+    """
+    Лёгкий профилировщик этапов обработки FASTQ.
+
+    Собирает суммарное время по этапам (чтение/распаковка, парсинг, декодирование
+    качества, агрегация, отрисовка), счётчики байтов и записей, а также пиковое
+    потребление памяти. В выключенном состоянии все методы сводятся к проверке
+    одного флага, поэтому инструментированный код можно оставлять в горячих циклах.
+
+    Attributes:
+        enabled (bool): Включён ли сбор данных.
+        trace_memory (bool): Отслеживать ли пиковую память через tracemalloc.
+        timers (dict[str, list]): Для каждого этапа — [суммарное время, число вызовов, максимум].
+        counters (dict[str, int]): Произвольные счётчики (bytes, records и т.д.).
+        events (list[dict]): Крупные этапы в формате Chrome Trace Event.
+        peak_memory (int): Пик памяти в байтах после stop().
+        peak_memory_scope (str): "run" — пик за запуск (tracemalloc); "process" —
+            пиковый RSS процесса за всё время работы (ru_maxrss не сбрасывается).
+        telemetry (Telemetry or None): Куда при stop() передаются итоги запуска.
+    """
+
+    def __init__(self, enabled: bool = False, trace_memory: bool = False,
+                 telemetry: Optional["Telemetry"] = None):
+        """
+        Инициализирует профилировщик.
+
+        Args:
+            enabled (bool): Включить сбор данных сразу.
+            trace_memory (bool): Включить tracemalloc для точного пика памяти
+                (заметно замедляет выполнение, поэтому выключено по умолчанию).
+            telemetry (Telemetry | None): Телеметрия программы: при stop() в неё
+                записываются суммарное время каждого этапа и счётчики запуска.
+        """
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.telemetry = telemetry
+        self.timers: dict[str, list] = {}
+        self.counters: dict[str, int] = {}
+        self.events: list[dict] = []
+        self.peak_memory = 0
+        self.peak_memory_scope = "process"
+        self._origin = time.perf_counter()
+        self._started_tracemalloc = False
+
+    def start(self):
+        """
+        Сбрасывает накопленные данные и включает сбор.
+        """
+        self.timers.clear()
+        self.counters.clear()
+        self.events.clear()
+        self.peak_memory = 0
+        self.peak_memory_scope = "process"
+        self._origin = time.perf_counter()
+        self.enabled = True
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        elif tracemalloc.is_tracing():
+            # Пик считается с начала этого запуска, а не с запуска tracemalloc
+            tracemalloc.reset_peak()
+
+    def stop(self):
+        """
+        Выключает сбор, фиксирует пиковое потребление памяти и передаёт
+        итоги запуска в телеметрию.
+        """
+        if not self.enabled:
+            return
+        self.peak_memory, self.peak_memory_scope = self._current_peak()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.enabled = False
+        if self.telemetry is not None:
+            for name, (total, _, _) in self.timers.items():
+                self.telemetry.record(name, total)
+            for name, n in self.counters.items():
+                self.telemetry.count(name, n)
+
+    def add_time(self, name: str, seconds: float):
+        """
+        Добавляет длительность к таймеру этапа.
+
+        Используется в горячих циклах, где контекстный менеджер слишком дорог.
+
+        Args:
+            name (str): Название этапа.
+            seconds (float): Длительность в секундах.
+        """
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [seconds, 1, seconds]
+        else:
+            timer[0] += seconds
+            timer[1] += 1
+            if seconds > timer[2]:
+                timer[2] = seconds
+
+    def count(self, name: str, n: int = 1):
+        """
+        Увеличивает счётчик.
+
+        Args:
+            name (str): Название счётчика.
+            n (int): Величина приращения.
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def stage(self, name: str):
+        """
+        Контекстный менеджер для замера крупного этапа.
+
+        Помимо таймера записывает событие для trace-файла. В выключенном
+        состоянии возвращает общий пустой контекст без аллокаций.
+
+        Args:
+            name (str): Название этапа.
+
+        Returns:
+            ContextManager: Контекст, измеряющий время выполнения блока.
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._stage(name)
+
+    @contextmanager
+    def _stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.add_time(name, end - start)
+            self.events.append({
+                "name": name,
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": 0,
+                "tid": 0,
+            })
+
+    def report(self) -> dict:
+        """
+        Возвращает собранные данные в виде словаря.
+
+        Returns:
+            dict: Словарь с ключами "stages", "counters", "peak_memory" (в байтах)
+                и "peak_memory_scope": "run" — пик за запуск (tracemalloc) или
+                "process" — пиковый RSS процесса за всё время работы.
+        """
+        if self.enabled:
+            peak, scope = self._current_peak()
+        else:
+            peak, scope = self.peak_memory, self.peak_memory_scope
+        return {
+            "stages": {
+                name: {"total": total, "calls": calls, "max": longest}
+                for name, (total, calls, longest) in self.timers.items()
+            },
+            "counters": dict(self.counters),
+            "peak_memory": peak,
+            "peak_memory_scope": scope,
+        }
+
+    def summary(self) -> str:
+        """
+        Короткая строка для строки статуса GUI.
+
+        Returns:
+            str: Например, "read 0.12s | parse 0.05s | 3001 rec | 1.2 MB | peak 48.0 MB".
+                Без tracemalloc вместо пика за запуск выводится "process peak RSS".
+        """
+        report = self.report()
+        parts = [f"{name} {stat['total']:.2f}s" for name, stat in report["stages"].items()]
+        counters = report["counters"]
+        if "records" in counters:
+            parts.append(f"{counters['records']} rec")
+        if "bytes" in counters:
+            parts.append(f"{counters['bytes'] / 2**20:.1f} MB")
+        if report["peak_memory"]:
+            label = "peak" if report["peak_memory_scope"] == "run" else "process peak RSS"
+            parts.append(f"{label} {report['peak_memory'] / 2**20:.1f} MB")
+        return " | ".join(parts)
+
+    def write_trace(self, path: str | Path):
+        """
+        Записывает trace-файл в формате Chrome Trace Event.
+
+        Файл открывается в chrome://tracing или https://ui.perfetto.dev.
+        Сводка по этапам и счётчики сохраняются в поле "otherData".
+
+        Args:
+            path (str | Path): Путь к выходному JSON-файлу.
+        """
+        trace = {"traceEvents": self.events, "otherData": self.report()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, ensure_ascii=False, indent=2)
+
+    def _current_peak(self) -> tuple[int, str]:
+        # Пик памяти в байтах и его охват: "run" или "process"
+        if tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[1], "run"
+        try:
+            from telemetry import peak_rss_bytes
+        except ImportError:  # профилировщик используют без корня репозитория в sys.path
+            return 0, "process"
+        return peak_rss_bytes() or 0, "process"
@@ -0,0 +1,227 @@
+"""
+Нагрузочный бенчмарк модуля учёта пациентов.
+
+Для каждого размера базы (по умолчанию от 1 тыс. до 1 млн пациентов) в отдельном
+процессе генерируется синтетическая база SQLite и замеряются:
+
+    load_first_page_s     — открытие базы и чтение первой страницы (до показа окна);
+    load_all_s            — чтение всех пациентов;
+    columns_build_s       — построение колонок и агрегатов статистики;
+    index_build_s         — построение индексов поиска (как в фоновом загрузчике);
+    save_edit_s           — сохранение одной правки (медиана);
+    save_add_s            — добавление одного пациента (медиана);
+    legacy_json_save_s    — старое сохранение: перезапись всего patients.json;
+    refresh_s             — перерисовка видимого окна таблицы после прокрутки;
+    search_s              — поиск по индексам (медиана по набору запросов);
+    stats_draw_s          — отрисовка окна статистики;
+    peak_rss_mb           — пиковая память процесса.
+
+Если Tk недоступен (нет дисплея), refresh_s измеряет только выборку строк окна
+без виджета, а в поле refresh_mode пишется "headless". Под виртуальным дисплеем
+(например, xvfb-run) измеряется настоящая перерисовка Treeview.
+
+Запуск:
+    python bench_patients.py --sizes 1000 10000 100000 -o bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from telemetry import peak_rss_bytes  # noqa: E402
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+GENERATE_CHUNK = 50_000
+REPEAT = 20
+VIEWPORT_ROWS = 30
+SEARCH_QUERIES = ("иван", "bmi > 30, age 40–60", "пет, w < 60", "age = 33")
+
+_SURNAMES = ("Иванов", "Петров", "Сидоров", "Смирнов", "Кузнецов", "Попов", "Волков")
+_NAMES = ("Иван", "Пётр", "Анна", "Мария", "Олег", "Елена", "Сергей")
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _median_time(fn, repeat: int = REPEAT) -> float:
+    return statistics.median(_timed(fn) for _ in range(repeat))
+
+
+def generate_db(path: str, size: int, seed: int = 0):
+    """Записывает size синтетических пациентов, не держа их все в памяти."""
+    from patient import calc_bmi
+    from storage import SQLiteStorage
+
+    rnd = random.Random(seed)
+    with SQLiteStorage(path, legacy_json=None) as storage:
+        for start in range(0, size, GENERATE_CHUNK):
+            rows = []
+            for _ in range(min(GENERATE_CHUNK, size - start)):
+                height = round(min(max(rnd.gauss(170, 10), 30), 300), 1)
+                weight = round(min(max(rnd.gauss(75, 15), 2), 500), 1)
+                rows.append((f"{rnd.choice(_SURNAMES)} {rnd.choice(_NAMES)}",
+                             rnd.randint(1, 100), rnd.choice("МЖ"),
+                             height, weight, calc_bmi(height, weight)))
+            with storage.conn:
+                storage.conn.executemany(
+                    "INSERT INTO patients (fio, age, sex, height, weight, bmi) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+
+
+def _measure_refresh(patients, positions) -> tuple[float, str]:
+    import tkinter as tk
+    from stats_patients import PatientApp
+    from table import VirtualTable
+
+    def fetch(start, stop):
+        return [PatientApp._row(p) for p in patients[start:stop]]
+
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        # Нет дисплея: меряем только подготовку строк видимого окна
+        middle = len(patients) // 2
+        return _median_time(lambda: fetch(middle, middle + VIEWPORT_ROWS)), "headless"
+
+    try:
+        table = VirtualTable(root, ("fio", "age", "sex", "h", "w", "bmi"),
+                             count=lambda: len(patients), fetch=fetch)
+        table.pack(fill="both", expand=True)
+        table.visible = VIEWPORT_ROWS
+        table.refresh()
+        root.update_idletasks()
+
+        def scroll():
+            # Прокрутка на целое окно: все видимые строки меняются
+            table.first = random.randrange(max(1, len(patients) - VIEWPORT_ROWS))
+            table.refresh()
+            root.update_idletasks()
+
+        return _median_time(scroll), "tk"
+    finally:
+        root.destroy()
+
+
+def run_single(size: int) -> dict:
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    from columns import PatientColumns
+    from index import PatientIndex, parse_query
+    from patient import make_patient
+    from stats_patients import FIRST_PAGE_SIZE, draw_stats
+    from storage import SQLiteStorage
+
+    result = {"size": size}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "patients.db")
+        generate_db(db_path, size)
+
+        def first_page():
+            with SQLiteStorage(db_path, legacy_json=None) as storage:
+                storage.load_page(FIRST_PAGE_SIZE)
+                storage.max_id()
+
+        result["load_first_page_s"] = _timed(first_page)
+
+        storage = SQLiteStorage(db_path, legacy_json=None)
+        patients = []
+        result["load_all_s"] = _timed(lambda: patients.extend(storage.load_all()))
+        positions = {p.id: i for i, p in enumerate(patients)}
+
+        columns = PatientColumns()
+        result["columns_build_s"] = _timed(lambda: columns.extend(patients))
+
+        index = PatientIndex(lambda pid: patients[positions[pid]])
+        result["index_build_s"] = _timed(lambda: index.build(patients, blockwise=True))
+
+        def save_edit():
+            p = patients[random.randrange(len(patients))]
+            p.weight = round(random.uniform(40, 120), 1)
+            storage.update(p)
+
+        result["save_edit_s"] = _median_time(save_edit)
+        result["save_add_s"] = _median_time(
+            lambda: storage.add(make_patient("Новиков Олег", 40, "М", 180, 80))
+        )
+
+        def legacy_save():
+            with open(os.path.join(tmp, "patients.json"), "w", encoding="utf-8") as f:
+                json.dump([{k: getattr(p, k) for k in ("fio", "age", "sex", "height", "weight", "bmi")}
+                           for p in patients], f, ensure_ascii=False, indent=4)
+
+        result["legacy_json_save_s"] = _timed(legacy_save)
+        storage.close()
+
+        result["refresh_s"], result["refresh_mode"] = _measure_refresh(patients, positions)
+
+        queries = [parse_query(q) for q in SEARCH_QUERIES]
+        result["search_s"] = statistics.median(
+            _timed(lambda: index.search(q)) for q in queries for _ in range(5)
+        )
+
+        fig = Figure(figsize=(12, 8))
+        canvas = FigureCanvasAgg(fig)
+
+        def draw():
+            draw_stats(fig, columns)
+            canvas.draw()
+
+        result["stats_draw_s"] = _timed(draw)
+
+    peak = peak_rss_bytes()
+    result["peak_rss_mb"] = None if peak is None else peak / 2**20
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк модуля учёта пациентов")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="размеры синтетических баз")
+    parser.add_argument("-o", "--output", help="файл для результатов JSON (по умолчанию stdout)")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        print(json.dumps(run_single(args.single)))
+        return
+
+    results = []
+    for size in args.sizes:
+        # Каждый размер — в отдельном процессе, чтобы пик памяти не накапливался
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--single", str(size)],
+                             capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        print(f"{size}: готово", file=sys.stderr)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import argparse
+import csv
+import json
+import os
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, TYPE_CHECKING
+
+from patient import Patient, SEXES, AGE_LIMITS, HEIGHT_LIMITS, WEIGHT_LIMITS, valid_fio
+from storage import PatientStorage, SQLiteStorage
+
+if TYPE_CHECKING:
+    import numpy as np
+
+CHUNK_SIZE = 10_000
+
+FIELDS = ("fio", "age", "sex", "height", "weight")
+EXPORT_FIELDS = FIELDS + ("bmi",)
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+# Обычный JSON — массив объектов, как в старом patients.json
+JSON_ARRAY_EXTENSIONS = (".json",)
+
+# (номер строки в файле, поля строки)
+RawRow = tuple[int, dict]
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    rejected: int = 0
+    rejects_path: Optional[str] = None
+
+
+def _is_json_lines(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in JSON_LINES_EXTENSIONS
+
+
+def _is_json_array(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in JSON_ARRAY_EXTENSIONS
+
+
+def read_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[list[RawRow]]:
+    """
+    Читает CSV (с заголовком), JSON Lines или массив JSON пачками по chunk_size строк.
+
+    Строки JSON, которые не удалось разобрать, отдаются с пустыми полями
+    и отклоняются при проверке. Массив JSON читается целиком, поэтому для
+    больших выгрузок лучше JSON Lines; номером строки для него служит номер
+    элемента массива.
+
+    Raises:
+        ValueError: если файл .json не является массивом JSON.
+    """
+    # utf-8-sig: Excel сохраняет CSV с BOM, иначе он попадает в имя первой колонки
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if _is_json_array(path):
+            data = json.load(f)
+            if not isinstance(data, list):
+                raise ValueError("Ожидается массив JSON")
+            rows = ((n, item if isinstance(item, dict) else {})
+                    for n, item in enumerate(data, start=1))
+        elif _is_json_lines(path):
+            rows = ((n, line) for n, line in enumerate(f, start=1) if line.strip())
+            rows = ((n, _parse_json_line(line)) for n, line in rows)
+        else:
+            reader = csv.DictReader(f)
+            rows = ((reader.line_num, row) for row in reader)
+
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _parse_json_line(line: str) -> dict:
+    try:
+        row = json.loads(line)
+    except ValueError:
+        return {}
+    return row if isinstance(row, dict) else {}
+
+
+def _to_int(values: list) -> "np.ndarray":
+    # Как int() в форме пациента: "40" подходит, "40.0" и 40.5 — нет; ошибки -> NaN
+    import numpy as np
+
+    out = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        if isinstance(value, bool):
+            continue
+        try:
+            if isinstance(value, int):
+                out[i] = value
+            elif isinstance(value, str):
+                out[i] = int(value)
+        except (ValueError, OverflowError):
+            pass
+    return out
+
+
+def _to_float(values: list) -> "np.ndarray":
+    import numpy as np
+
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (ValueError, TypeError):
+        # В пачке есть нечисловые значения: разбираем поштучно, ошибки -> NaN
+        out = np.full(len(values), np.nan)
+        for i, value in enumerate(values):
+            try:
+                out[i] = float(value)
+            except (ValueError, TypeError):
+                pass
+        return out
+
+
+def validate_chunk(rows: list[RawRow]) -> tuple[list[Patient], list[tuple[int, str, dict]]]:
+    """
+    Проверяет пачку строк по тем же правилам, что и форма пациента,
+    и считает ИМТ для всей пачки сразу.
+
+    Returns:
+        Кортеж (корректные пациенты, отклонённые строки в виде (номер, причина, поля)).
+    """
+    import numpy as np
+
+    fio = [str(row.get("fio") or "").strip() for _, row in rows]
+    sex = [str(row.get("sex") or "").strip() for _, row in rows]
+    age = _to_int([row.get("age") for _, row in rows])
+    height = _to_float([row.get("height") for _, row in rows])
+    weight = _to_float([row.get("weight") for _, row in rows])
+
+    bad_row = np.fromiter((not row for _, row in rows), dtype=bool, count=len(rows))
+    bad_fio = np.fromiter((not valid_fio(s) for s in fio), dtype=bool, count=len(rows))
+    bad_sex = ~np.isin(np.asarray(sex, dtype=object), SEXES)
+    # Сравнения с NaN ложны, поэтому нечисловые значения тоже отсекаются
+    bad_age = ~((age > AGE_LIMITS[0]) & (age <= AGE_LIMITS[1]))
+    bad_height = ~((height >= HEIGHT_LIMITS[0]) & (height <= HEIGHT_LIMITS[1]))
+    bad_weight = ~((weight >= WEIGHT_LIMITS[0]) & (weight <= WEIGHT_LIMITS[1]))
+
+    # Порядок причин совпадает с порядком проверок в make_patient
+    reasons = np.select(
+        [bad_row, bad_fio, bad_age, bad_sex, bad_height, bad_weight],
+        ["Некорректная строка", "Некорректное ФИО", "Неверный возраст",
+         "Неверный пол", "Неверный рост", "Неверный вес"],
+        default="",
+    )
+    ok = reasons == ""
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bmi = np.round(weight / (height / 100) ** 2, 2)
+
+    patients = [
+        Patient(fio[i], int(age[i]), sex[i], float(height[i]), float(weight[i]), float(bmi[i]))
+        for i in np.flatnonzero(ok)
+    ]
+    rejects = [(rows[i][0], str(reasons[i]), rows[i][1]) for i in np.flatnonzero(~ok)]
+    return patients, rejects
+
+
+def import_patients(path: str, storage: PatientStorage,
+                    on_chunk: Optional[Callable[[list[Patient]], None]] = None,
+                    chunk_size: int = CHUNK_SIZE,
+                    rejects_path: Optional[str] = None) -> ImportReport:
+    """
+    Потоково импортирует пациентов из CSV, JSON Lines или массива JSON.
+
+    Каждая пачка проверяется и записывается одной транзакцией; в памяти
+    одновременно находится не больше одной пачки. Отклонённые строки не
+    прерывают импорт и пишутся в rejects_path (по умолчанию <path>.rejected.csv).
+    """
+    report = ImportReport()
+    rejects_path = rejects_path or path + ".rejected.csv"
+    rejects_file = None
+    writer = None
+
+    try:
+        for rows in read_chunks(path, chunk_size):
+            patients, rejects = validate_chunk(rows)
+            if patients:
+                storage.add_many(patients)
+                report.imported += len(patients)
+                if on_chunk:
+                    on_chunk(patients)
+
+            if rejects:
+                if writer is None:
+                    rejects_file = open(rejects_path, "w", encoding="utf-8", newline="")
+                    writer = csv.writer(rejects_file)
+                    writer.writerow(("line", "reason") + FIELDS)
+                for line, reason, row in rejects:
+                    writer.writerow((line, reason) + tuple(row.get(k, "") for k in FIELDS))
+                report.rejected += len(rejects)
+    finally:
+        if rejects_file:
+            rejects_file.close()
+
+    if report.rejected:
+        report.rejects_path = rejects_path
+    return report
+
+
+def export_patients(path: str, storage: PatientStorage, chunk_size: int = CHUNK_SIZE) -> int:
+    """Потоково выгружает всех пациентов в CSV, JSON Lines или массив JSON. Возвращает их число."""
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if _is_json_array(path):
+            f.write("[")
+            for chunk in storage.iter_chunks(chunk_size):
+                f.writelines(
+                    ("," if count or i else "") + "\n    "
+                    + json.dumps({k: getattr(p, k) for k in EXPORT_FIELDS}, ensure_ascii=False)
+                    for i, p in enumerate(chunk)
+                )
+                count += len(chunk)
+            f.write("\n]\n")
+        elif _is_json_lines(path):
+            for chunk in storage.iter_chunks(chunk_size):
+                f.writelines(
+                    json.dumps({k: getattr(p, k) for k in EXPORT_FIELDS}, ensure_ascii=False) + "\n"
+                    for p in chunk
+                )
+                count += len(chunk)
+        else:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_FIELDS)
+            for chunk in storage.iter_chunks(chunk_size):
+                writer.writerows(tuple(getattr(p, k) for k in EXPORT_FIELDS) for p in chunk)
+                count += len(chunk)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Массовый импорт и экспорт пациентов")
+    parser.add_argument("action", choices=("import", "export"))
+    parser.add_argument("path", help="файл .csv или .jsonl")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with SQLiteStorage() as storage:
+        if args.action == "import":
+            report = import_patients(args.path, storage, chunk_size=args.chunk_size)
+            print(f"Импортировано: {report.imported}, отклонено: {report.rejected}")
+            if report.rejects_path:
+                print(f"Отклонённые строки: {report.rejects_path}")
+        else:
+            count = export_patients(args.path, storage, chunk_size=args.chunk_size)
+            print(f"Выгружено: {count}")
+
+
+if __name__ == "__main__":
+    main()
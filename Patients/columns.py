@@ -0,0 +1,187 @@
+from array import array
+from typing import Iterable
+
+from patient import Patient, SEXES
+
+# Фиксированные корзины гистограмм: их можно пересчитывать по одному пациенту.
+# Значения за пределами диапазона считаются отдельно (underflow / overflow)
+# и показываются на графике, а не смешиваются с крайними корзинами.
+AGE_RANGE = (0, 150, 10)
+BMI_RANGE = (10, 60, 2.5)
+# Более мелкая сетка для карты плотности «возраст — ИМТ»
+DENSITY_AGE_RANGE = (0, 150, 2)
+DENSITY_BMI_RANGE = (10, 60, 1)
+
+
+class RunningStats:
+    """Среднее и дисперсия по алгоритму Уэлфорда с поддержкой удаления."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, x: float):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (x - self.mean)
+
+    def remove(self, x: float):
+        if self.n <= 1:
+            self.__init__()
+            return
+        self.n -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.n
+        self._m2 -= delta * (x - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return max(self._m2, 0.0) / self.n if self.n else 0.0
+
+    @property
+    def std(self) -> float:
+        return self.variance ** 0.5
+
+
+class Histogram:
+    """
+    Гистограмма с корзинами постоянной ширины на отрезке [lo, hi].
+
+    Последняя корзина включает правую границу, как в numpy.histogram.
+    Значения вне отрезка учитываются в underflow и overflow.
+    """
+
+    def __init__(self, lo: float, hi: float, step: float):
+        self.lo = lo
+        self.hi = hi
+        self.step = step
+        self.bins = int(round((hi - lo) / step))
+        self.counts = [0] * self.bins
+        self.underflow = 0
+        self.overflow = 0
+
+    @property
+    def edges(self) -> list[float]:
+        return [self.lo + i * self.step for i in range(self.bins + 1)]
+
+    def bin(self, x: float) -> int:
+        """Номер корзины; -1 — левее lo, bins — правее hi."""
+        if x < self.lo:
+            return -1
+        if x > self.hi:
+            return self.bins
+        return min(int((x - self.lo) // self.step), self.bins - 1)
+
+    def add(self, x: float):
+        self._change(x, 1)
+
+    def remove(self, x: float):
+        self._change(x, -1)
+
+    def _change(self, x: float, delta: int):
+        i = self.bin(x)
+        if i < 0:
+            self.underflow += delta
+        elif i >= self.bins:
+            self.overflow += delta
+        else:
+            self.counts[i] += delta
+
+
+class Histogram2D:
+    """
+    Двумерная гистограмма: счётчики хранятся построчно по корзинам x.
+
+    Точки, выходящие за сетку хотя бы по одной оси, учитываются в outside.
+    """
+
+    def __init__(self, x_range: tuple, y_range: tuple):
+        self.x = Histogram(*x_range)
+        self.y = Histogram(*y_range)
+        self.counts = [0] * (self.x.bins * self.y.bins)
+        self.outside = 0
+
+    def add(self, x: float, y: float):
+        self._change(x, y, 1)
+
+    def remove(self, x: float, y: float):
+        self._change(x, y, -1)
+
+    def _change(self, x: float, y: float, delta: int):
+        i, j = self.x.bin(x), self.y.bin(y)
+        if 0 <= i < self.x.bins and 0 <= j < self.y.bins:
+            self.counts[i * self.y.bins + j] += delta
+        else:
+            self.outside += delta
+
+
+class PatientColumns:
+    """
+    Числовые поля пациентов в виде колонок (array) и агрегаты по ним.
+
+    Позиции в колонках совпадают с позициями в списке пациентов приложения.
+    Счётчики по полу, гистограммы возраста и ИМТ (в том числе совместная),
+    среднее и дисперсия
+    обновляются при каждом добавлении или правке, поэтому статистика
+    не требует прохода по всем пациентам.
+    """
+
+    def __init__(self):
+        self.age = array("d")
+        self.height = array("d")
+        self.weight = array("d")
+        self.bmi = array("d")
+        self.sex = array("b")
+
+        self.sex_counts = [0] * len(SEXES)
+        self.age_hist = Histogram(*AGE_RANGE)
+        self.bmi_hist = Histogram(*BMI_RANGE)
+        self.age_bmi_hist = Histogram2D(DENSITY_AGE_RANGE, DENSITY_BMI_RANGE)
+        self.age_stats = RunningStats()
+        self.bmi_stats = RunningStats()
+
+        # Увеличивается при любом изменении данных
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.age)
+
+    def extend(self, patients: Iterable[Patient]):
+        for p in patients:
+            self.append(p)
+
+    def append(self, p: Patient):
+        self.age.append(p.age)
+        self.height.append(p.height)
+        self.weight.append(p.weight)
+        self.bmi.append(p.bmi)
+        self.sex.append(SEXES.index(p.sex))
+        self._account(p.age, p.bmi, SEXES.index(p.sex), 1)
+        self.version += 1
+
+    def replace(self, i: int, p: Patient):
+        self._account(self.age[i], self.bmi[i], self.sex[i], -1)
+        self.age[i] = p.age
+        self.height[i] = p.height
+        self.weight[i] = p.weight
+        self.bmi[i] = p.bmi
+        self.sex[i] = SEXES.index(p.sex)
+        self._account(p.age, p.bmi, self.sex[i], 1)
+        self.version += 1
+
+    def _account(self, age: float, bmi: float, sex: int, sign: int):
+        self.sex_counts[sex] += sign
+        if sign > 0:
+            self.age_hist.add(age)
+            self.bmi_hist.add(bmi)
+            self.age_bmi_hist.add(age, bmi)
+            self.age_stats.add(age)
+            self.bmi_stats.add(bmi)
+        else:
+            self.age_hist.remove(age)
+            self.bmi_hist.remove(bmi)
+            self.age_bmi_hist.remove(age, bmi)
+            self.age_stats.remove(age)
+            self.bmi_stats.remove(bmi)
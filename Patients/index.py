@@ -0,0 +1,278 @@
+import heapq
+import re
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Iterable, Optional, Sequence
+
+from patient import Patient
+
+# Колонка таблицы -> поле Patient
+COLUMN_FIELDS = {
+    "fio": "fio",
+    "age": "age",
+    "sex": "sex",
+    "h": "height",
+    "w": "weight",
+    "bmi": "bmi",
+}
+
+# Имена полей, допустимые в строке поиска
+QUERY_FIELDS = {
+    "age": "age", "возраст": "age",
+    "h": "height", "height": "height", "рост": "height",
+    "w": "weight", "weight": "weight", "вес": "weight",
+    "bmi": "bmi", "имт": "bmi",
+}
+
+_INF = float("inf")
+
+# Размер блока при построении индекса в фоновом потоке
+BUILD_BLOCK = 50_000
+
+_COMPARISON = re.compile(r"^(\w+)\s*(>=|<=|>|<|=)\s*(-?\d+(?:[.,]\d+)?)$")
+_RANGE = re.compile(r"^(\w+)\s*(-?\d+(?:[.,]\d+)?)\s*[-–—]\s*(-?\d+(?:[.,]\d+)?)$")
+
+
+def _key(field: str, value):
+    return value.casefold() if field in ("fio", "sex") else value
+
+
+class SortedIndex:
+    """Отсортированный список пар (значение, id) с поиском диапазонов через bisect."""
+
+    def __init__(self):
+        self.items: list[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def build(self, pairs: Iterable[tuple], blockwise: bool = False):
+        """
+        Строит индекс по парам (значение, id).
+
+        При blockwise=True пары сортируются блоками и сливаются через heapq.merge:
+        это медленнее, но не держит GIL секундами, поэтому подходит для фонового
+        потока, пока главный поток обслуживает интерфейс.
+        """
+        if not blockwise:
+            self.items = sorted(pairs)
+            return
+        blocks, block = [], []
+        for pair in pairs:
+            block.append(pair)
+            if len(block) >= BUILD_BLOCK:
+                blocks.append(sorted(block))
+                block = []
+        blocks.append(sorted(block))
+        self.items = list(heapq.merge(*blocks))
+
+    def add(self, key, pid: int):
+        insort(self.items, (key, pid))
+
+    def remove(self, key, pid: int):
+        i = bisect_left(self.items, (key, pid))
+        if i < len(self.items) and self.items[i] == (key, pid):
+            del self.items[i]
+
+    def bounds(self, lo=None, hi=None, lo_inclusive=True, hi_inclusive=True) -> tuple[int, int]:
+        """Границы [i, j) элементов, попадающих в диапазон значений."""
+        if lo is None:
+            i = 0
+        elif lo_inclusive:
+            i = bisect_left(self.items, (lo,))
+        else:
+            i = bisect_right(self.items, (lo, _INF))
+        if hi is None:
+            j = len(self.items)
+        elif hi_inclusive:
+            j = bisect_right(self.items, (hi, _INF))
+        else:
+            j = bisect_left(self.items, (hi,))
+        return i, max(i, j)
+
+    def ids(self, i: int, j: int) -> list[int]:
+        return [pid for _, pid in self.items[i:j]]
+
+
+class PrefixIndex(SortedIndex):
+    """
+    Индекс для поиска по началу ФИО.
+
+    Для каждого пациента хранится ФИО, начиная с каждого слова
+    ("иванов иван", "иван"), поэтому запрос совпадает с началом
+    фамилии, имени или отчества.
+    """
+
+    @staticmethod
+    def tokens(fio: str) -> list[str]:
+        words = fio.casefold().split()
+        return [" ".join(words[k:]) for k in range(len(words))]
+
+    def build_from(self, patients: Iterable[Patient], blockwise: bool = False):
+        self.build(((token, p.id) for p in patients for token in self.tokens(p.fio)), blockwise)
+
+    def add_patient(self, p: Patient):
+        for token in self.tokens(p.fio):
+            self.add(token, p.id)
+
+    def remove_patient(self, p: Patient):
+        for token in self.tokens(p.fio):
+            self.remove(token, p.id)
+
+    def prefix_bounds(self, prefix: str) -> tuple[int, int]:
+        prefix = prefix.casefold()
+        return bisect_left(self.items, (prefix,)), bisect_left(self.items, (prefix + "\U0010ffff",))
+
+
+class IndexView(Sequence):
+    """Ленивое представление id в порядке индекса; срез стоит O(длины среза)."""
+
+    def __init__(self, index: SortedIndex, reverse: bool = False):
+        self.index = index
+        self.reverse = reverse
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, item):
+        n = len(self.index)
+        if isinstance(item, slice):
+            start, stop, _ = item.indices(n)
+            if self.reverse:
+                return self.index.ids(n - stop, n - start)[::-1]
+            return self.index.ids(start, stop)
+        if item < 0:
+            item += n
+        if self.reverse:
+            item = n - 1 - item
+        return self.index.items[item][1]
+
+
+class Condition:
+    """Одно условие поиска: диапазон по числовому полю или префикс ФИО."""
+
+    def __init__(self, field: str, lo=None, hi=None, lo_inclusive=True, hi_inclusive=True):
+        self.field = field
+        self.lo = lo
+        self.hi = hi
+        self.lo_inclusive = lo_inclusive
+        self.hi_inclusive = hi_inclusive
+
+    def match(self, p: Patient) -> bool:
+        if self.field == "fio":
+            return any(token.startswith(self.lo) for token in PrefixIndex.tokens(p.fio))
+        value = getattr(p, self.field)
+        if self.lo is not None and (value < self.lo or (value == self.lo and not self.lo_inclusive)):
+            return False
+        if self.hi is not None and (value > self.hi or (value == self.hi and not self.hi_inclusive)):
+            return False
+        return True
+
+
+def parse_query(text: str) -> list[Condition]:
+    """
+    Разбирает строку поиска вида "иван, bmi > 30, age 40–60".
+
+    Части разделяются запятыми или точкой с запятой. Часть, не похожая
+    на условие по числовому полю, считается началом ФИО.
+
+    Raises:
+        ValueError: если указано неизвестное поле.
+    """
+    conditions = []
+    for part in re.split(r"[,;]", text):
+        part = part.strip()
+        if not part:
+            continue
+
+        m = _RANGE.match(part)
+        if m and m.group(1).casefold() in QUERY_FIELDS:
+            field = QUERY_FIELDS[m.group(1).casefold()]
+            lo, hi = sorted(float(x.replace(",", ".")) for x in m.group(2, 3))
+            conditions.append(Condition(field, lo, hi))
+            continue
+
+        m = _COMPARISON.match(part)
+        if m:
+            name, op, number = m.groups()
+            if name.casefold() not in QUERY_FIELDS:
+                raise ValueError(f"Неизвестное поле: {name}")
+            field = QUERY_FIELDS[name.casefold()]
+            value = float(number.replace(",", "."))
+            if op == "=":
+                conditions.append(Condition(field, value, value))
+            elif op in (">", ">="):
+                conditions.append(Condition(field, lo=value, lo_inclusive=op == ">="))
+            else:
+                conditions.append(Condition(field, hi=value, hi_inclusive=op == "<="))
+            continue
+
+        conditions.append(Condition("fio", lo=part.casefold()))
+    return conditions
+
+
+class PatientIndex:
+    """
+    Индексы таблицы пациентов: префиксный по ФИО и отсортированные по всем колонкам.
+
+    Поиск выбирает самое избирательное условие, берёт его диапазон из индекса
+    и проверяет остальные условия только на найденных кандидатах, так что
+    полного прохода по пациентам не происходит.
+    """
+
+    def __init__(self, get_patient: Callable[[int], Patient]):
+        self.get_patient = get_patient
+        self.fio_prefix = PrefixIndex()
+        self.sorted = {field: SortedIndex() for field in COLUMN_FIELDS.values()}
+
+    def build(self, patients: Sequence[Patient], blockwise: bool = False):
+        self.fio_prefix.build_from(patients, blockwise)
+        for field, index in self.sorted.items():
+            index.build(((_key(field, getattr(p, field)), p.id) for p in patients), blockwise)
+
+    def add(self, p: Patient):
+        self.fio_prefix.add_patient(p)
+        for field, index in self.sorted.items():
+            index.add(_key(field, getattr(p, field)), p.id)
+
+    def replace(self, old: Patient, new: Patient):
+        self.fio_prefix.remove_patient(old)
+        for field, index in self.sorted.items():
+            index.remove(_key(field, getattr(old, field)), old.id)
+        self.add(new)
+
+    def view(self, column: str, reverse: bool = False) -> IndexView:
+        """Все id в порядке сортировки по колонке таблицы."""
+        return IndexView(self.sorted[COLUMN_FIELDS[column]], reverse)
+
+    def sort_ids(self, ids: list[int], column: str, reverse: bool = False) -> list[int]:
+        field = COLUMN_FIELDS[column]
+        return sorted(ids, key=lambda pid: _key(field, getattr(self.get_patient(pid), field)),
+                      reverse=reverse)
+
+    def search(self, conditions: list[Condition]) -> Optional[list[int]]:
+        """id пациентов, удовлетворяющих всем условиям; None, если условий нет."""
+        if not conditions:
+            return None
+
+        best = None
+        for cond in conditions:
+            if cond.field == "fio":
+                index = self.fio_prefix
+                i, j = index.prefix_bounds(cond.lo)
+            else:
+                index = self.sorted[cond.field]
+                i, j = index.bounds(cond.lo, cond.hi, cond.lo_inclusive, cond.hi_inclusive)
+            if best is None or j - i < best[2] - best[1]:
+                best = (index, i, j, cond)
+
+        index, i, j, chosen = best
+        candidates = index.ids(i, j)
+        if chosen.field == "fio":
+            # Один пациент может совпасть по нескольким словам ФИО
+            candidates = list(dict.fromkeys(candidates))
+
+        rest = [cond for cond in conditions if cond is not chosen]
+        if not rest:
+            return candidates
+        return [pid for pid in candidates
+                if all(cond.match(self.get_patient(pid)) for cond in rest)]
@@ -0,0 +1,50 @@
+import queue
+import threading
+from typing import Callable
+
+from index import PatientIndex
+from patient import Patient
+from storage import SQLiteStorage
+
+LOAD_CHUNK_SIZE = 10_000
+
+
+class BackgroundLoader(threading.Thread):
+    """
+    Дочитывает пациентов из базы в фоновом потоке.
+
+    Поток открывает собственное соединение с SQLite и кладёт в очередь
+    сообщения, которые главный поток забирает через root.after:
+
+        ("chunk", list[Patient]) — очередная пачка пациентов по возрастанию id;
+        ("index", PatientIndex)  — индексы по всем загруженным пациентам;
+        ("error", Exception)     — загрузка прервана.
+
+    Читаются только записи с after_id < id <= upto_id, поэтому пациенты,
+    добавленные во время загрузки, не попадут в список дважды.
+    """
+
+    def __init__(self, db_path: str, loaded: list[Patient], after_id: int, upto_id: int,
+                 get_patient: Callable[[int], Patient], chunk_size: int = LOAD_CHUNK_SIZE):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        # Копия списка: главный поток будет менять свой список параллельно
+        self.loaded = list(loaded)
+        self.after_id = after_id
+        self.upto_id = upto_id
+        self.get_patient = get_patient
+        self.chunk_size = chunk_size
+        self.queue: queue.Queue = queue.Queue()
+
+    def run(self):
+        try:
+            with SQLiteStorage(self.db_path, legacy_json=None) as storage:
+                for chunk in storage.iter_chunks(self.chunk_size, self.after_id, self.upto_id):
+                    self.loaded.extend(chunk)
+                    self.queue.put(("chunk", chunk))
+
+            index = PatientIndex(self.get_patient)
+            index.build(self.loaded, blockwise=True)
+            self.queue.put(("index", index))
+        except Exception as e:
+            self.queue.put(("error", e))
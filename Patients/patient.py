@@ -0,0 +1,46 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+SEXES = ("М", "Ж")
+
+# Допустимые значения: возраст (0, 150], рост [30, 300] см, вес [2, 500] кг
+AGE_LIMITS = (0, 150)
+HEIGHT_LIMITS = (30, 300)
+WEIGHT_LIMITS = (2, 500)
+
+
+@dataclass
+class Patient:
+    fio: str
+    age: int
+    sex: str
+    height: float
+    weight: float
+    bmi: float
+    # Ключ строки в хранилище; None — пациент ещё не сохранён
+    id: Optional[int] = field(default=None, compare=False)
+
+
+def calc_bmi(height: float, weight: float) -> float:
+    return round(weight / ((height / 100) ** 2), 2)
+
+
+def valid_fio(fio: str) -> bool:
+    """ФИО непустое и без цифр (включая «²», «①» и т.п.)."""
+    return bool(fio) and not any(ch.isdigit() for ch in fio)
+
+
+def make_patient(fio: str, age: int, sex: str, height: float, weight: float) -> Patient:
+    """Проверяет введённые данные и создаёт пациента с рассчитанным ИМТ."""
+    fio = fio.strip()
+    if not valid_fio(fio):
+        raise ValueError("Некорректное ФИО")
+    if age <= AGE_LIMITS[0] or age > AGE_LIMITS[1]:
+        raise ValueError("Неверный возраст")
+    if sex not in SEXES:
+        raise ValueError("Неверный пол")
+    if height < HEIGHT_LIMITS[0] or height > HEIGHT_LIMITS[1]:
+        raise ValueError("Неверный рост")
+    if weight < WEIGHT_LIMITS[0] or weight > WEIGHT_LIMITS[1]:
+        raise ValueError("Неверный вес")
+    return Patient(fio, age, sex, height, weight, calc_bmi(height, weight))
@@ -1,24 +1,37 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from dataclasses import dataclass
-from typing import Optional
-import json
+from tkinter import ttk, messagebox, filedialog
+from typing import Optional, Sequence, TYPE_CHECKING
+import csv
 import os
-import matplotlib.pyplot as plt
-import numpy as np
+import queue
+import sqlite3
+import sys
+import time
+import bulk
+from columns import PatientColumns
+from index import PatientIndex, parse_query
+from loader import BackgroundLoader
+from patient import Patient, SEXES, make_patient
+from storage import SQLiteStorage
+from table import VirtualTable
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prewarm import prewarm  # noqa: E402
+from telemetry import Telemetry  # noqa: E402
 
-@dataclass
-class Patient:
-    fio: str
-    age: int
-    sex: str
-    height: float
-    weight: float
-    bmi: float
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
+# Сколько пациентов читается до показа окна; остальные дочитываются в фоне
+FIRST_PAGE_SIZE = 1000
+LOAD_POLL_MS = 50
 
-DB_FILE = "patients.json"
+# С какого числа пациентов точечный график заменяется картой плотности
+DENSITY_THRESHOLD = 5000
+
+# Предзагрузка matplotlib для окна статистики начинается позже, чем в FastQC Lite:
+# первые секунды после показа окна в фоне дочитывается база
+PREWARM_DELAY_MS = 1000
 
 
 class PatientForm(tk.Toplevel):
@@ -30,7 +43,7 @@ class PatientForm(tk.Toplevel):
 
         self.e_fio = self._make_input("ФИО")
         self.e_age = self._make_input("Возраст")
-        self.c_sex = self._make_combo("Пол", ["М", "Ж"])
+        self.c_sex = self._make_combo("Пол", list(SEXES))
         self.e_height = self._make_input("Рост (см)")
         self.e_weight = self._make_input("Вес (кг)")
 
@@ -58,24 +71,8 @@ class PatientForm(tk.Toplevel):
 
     def save(self):
         try:
-            fio = self.e_fio.get().strip()
-            if not fio or any(ch.isdigit() for ch in fio):
-                raise ValueError("Некорректное ФИО")
-
-            age = int(self.e_age.get())
-            height = float(self.e_height.get())
-            weight = float(self.e_weight.get())
-
-            if age <= 0 or age > 150:
-                raise ValueError("Неверный возраст")
-            if height < 30 or height > 300:
-                raise ValueError("Неверный рост")
-            if weight < 2 or weight > 500:
-                raise ValueError("Неверный вес")
-
-            bmi = round(weight / ((height / 100) ** 2), 2)
-
-            new_patient = Patient(fio, age, self.c_sex.get(), height, weight, bmi)
+            new_patient = make_patient(self.e_fio.get(), int(self.e_age.get()), self.c_sex.get(),
+                                       float(self.e_height.get()), float(self.e_weight.get()))
             self.on_save(new_patient)
             self.destroy()
 
@@ -83,6 +80,118 @@ class PatientForm(tk.Toplevel):
             messagebox.showerror("Ошибка", str(e))
 
 
+def draw_stats(fig: "Figure", cols: PatientColumns, density_threshold: int = DENSITY_THRESHOLD):
+    # Рисует четыре графика статистики на переданной фигуре (без привязки к окну)
+    import numpy as np
+    from matplotlib.colors import LogNorm
+
+    fig.clear()
+
+    # График 1: Распределение пациентов по полу
+    ax = fig.add_subplot(2, 2, 1)
+    ax.set_title("Распределение пациентов по полу")
+    ax.set_xlabel("Пол")
+    ax.set_ylabel("Количество")
+
+    male_count, female_count = cols.sex_counts
+
+    ax.bar(["Мужчины", "Женщины"], [male_count, female_count], color=["blue", "pink"])
+    ax.grid(True, axis='y')
+
+    # График 2: Распределение возраста пациентов
+    ax = fig.add_subplot(2, 2, 2)
+    ax.set_title("Распределение возраста пациентов")
+    ax.set_xlabel("Возраст")
+    ax.set_ylabel("Количество")
+    _plot_histogram(ax, cols.age_hist, cols.age_stats, "orange")
+    ax.grid(True)
+
+    # График 3: Распределение ИМТ пациентов
+    ax = fig.add_subplot(2, 2, 3)
+    ax.set_title("Распределение ИМТ пациентов")
+    ax.set_xlabel("ИМТ")
+    ax.set_ylabel("Количество")
+    _plot_histogram(ax, cols.bmi_hist, cols.bmi_stats, "green")
+    ax.grid(True)
+
+    # График 4: Зависимость ИМТ от возраста
+    ax = fig.add_subplot(2, 2, 4)
+    ax.set_title("Зависимость ИМТ от возраста")
+    ax.set_xlabel("Возраст")
+    ax.set_ylabel("ИМТ")
+    if len(cols) > density_threshold:
+        # Много точек: рисуем карту плотности по готовой двумерной гистограмме
+        hist = cols.age_bmi_hist
+        counts = np.array(hist.counts).reshape(hist.x.bins, hist.y.bins)
+        if counts.any():
+            mesh = ax.pcolormesh(hist.x.edges, hist.y.edges, np.ma.masked_equal(counts.T, 0),
+                                 cmap="Reds", norm=LogNorm())
+            fig.colorbar(mesh, ax=ax, label="Пациентов")
+        else:
+            # Все точки вне сетки: LogNorm не может построить шкалу по пустым данным
+            ax.set_xlim(hist.x.edges[0], hist.x.edges[-1])
+            ax.set_ylim(hist.y.edges[0], hist.y.edges[-1])
+        if hist.outside:
+            ax.text(0.01, 0.99, f"вне сетки: {hist.outside}", transform=ax.transAxes,
+                    va="top", fontsize="small")
+    else:
+        ax.scatter(np.array(cols.age), np.array(cols.bmi), color="red")
+    ax.grid(True)
+
+    fig.tight_layout()
+
+
+def _plot_histogram(ax, hist, running, color):
+    # Гистограмма строится по уже посчитанным корзинам, без прохода по данным
+    ax.bar(hist.edges[:-1], hist.counts, width=hist.step, align="edge",
+           color=color, edgecolor="black")
+    # Значения вне диапазона корзин — отдельными заштрихованными столбцами по краям
+    if hist.underflow:
+        ax.bar(hist.lo - hist.step, hist.underflow, width=hist.step, align="edge",
+               color="lightgray", edgecolor="black", hatch="//",
+               label=f"< {hist.lo:g}: {hist.underflow}")
+    if hist.overflow:
+        ax.bar(hist.hi, hist.overflow, width=hist.step, align="edge",
+               color="lightgray", edgecolor="black", hatch="//",
+               label=f"> {hist.hi:g}: {hist.overflow}")
+    ax.axvline(running.mean, color="black", linestyle="--",
+               label=f"среднее {running.mean:.1f} ± {running.std:.1f}")
+    ax.legend()
+
+
+class StatsWindow(tk.Toplevel):
+    def __init__(self, master, density_threshold: int = DENSITY_THRESHOLD,
+                 telemetry: Optional[Telemetry] = None):
+        super().__init__(master)
+        self.title("Статистика")
+        self.density_threshold = density_threshold
+        self.telemetry = telemetry or Telemetry("patients")
+
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=(12, 8))
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+        # Версия данных, по которой нарисован текущий график
+        self.version = None
+        # Закрытое окно прячется, чтобы не перерисовывать графики без изменений
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+
+    def show(self, cols: PatientColumns):
+        if cols.version != self.version:
+            self.draw(cols)
+            self.version = cols.version
+        self.deiconify()
+        self.lift()
+
+    def draw(self, cols: PatientColumns):
+        with self.telemetry.timer("plot"):
+            draw_stats(self.figure, cols, self.density_threshold)
+            self.canvas.draw()
+
+
 class PatientApp:
     def __init__(self, root):
         self.root = root
@@ -90,13 +199,47 @@ class PatientApp:
         self.root.geometry("900x600")
 
         self.patients: list[Patient] = []
+        # id пациента -> позиция в self.patients
+        self.positions: dict[int, int] = {}
+        # Числовые колонки и агрегаты для статистики
+        self.columns = PatientColumns()
+        # Индексы для поиска и сортировки
+        self.index = PatientIndex(lambda pid: self.patients[self.positions[pid]])
+        # Порядок id в таблице; None — порядок добавления
+        self.view: Optional[Sequence[int]] = None
+        self.conditions = []
+        self.sort_column: Optional[str] = None
+        self.sort_reverse = False
+        self._search_job = None
+        # Фоновая загрузка и правки, ждущие готовности индексов
+        self.loader: Optional[BackgroundLoader] = None
+        self._pending_index_ops: list[tuple[Optional[Patient], Patient]] = []
+        self.stats_window: Optional[StatsWindow] = None
+        self.telemetry = Telemetry.from_env("patients")
+        try:
+            self.storage = SQLiteStorage()
+        except (sqlite3.Error, ValueError) as e:
+            messagebox.showerror("Ошибка", f"Не удалось открыть базу пациентов: {e}")
+            raise
         self.load()
-
-        self.sheet = ttk.Treeview(root, columns=("fio", "age", "sex", "h", "w", "bmi"),
-                                  show="headings")
-        for col in self.sheet["columns"]:
-            self.sheet.heading(col, text=col)
-            self.sheet.column(col, width=140)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+        search_bar = tk.Frame(root)
+        search_bar.pack(fill="x", padx=5, pady=5)
+        tk.Label(search_bar, text="Поиск:").pack(side="left")
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self._schedule_search())
+        tk.Entry(search_bar, textvariable=self.search_var).pack(side="left", fill="x",
+                                                                 expand=True, padx=5)
+        self.search_status = tk.Label(search_bar, text="", width=30, anchor="w")
+        self.search_status.pack(side="left")
+
+        self.sheet = VirtualTable(root, ("fio", "age", "sex", "h", "w", "bmi"),
+                                  count=self._row_count,
+                                  fetch=self._fetch_rows)
+        for col in self.sheet.tree["columns"]:
+            self.sheet.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            self.sheet.tree.column(col, width=140)
         self.sheet.pack(fill="both", expand=True)
 
         panel = tk.Frame(root)
@@ -104,37 +247,176 @@ class PatientApp:
 
         tk.Button(panel, text="Добавить", command=self.add).pack(side="left", padx=5)
         tk.Button(panel, text="Редактировать", command=self.edit).pack(side="left", padx=5)
+        tk.Button(panel, text="Импорт", command=self.import_file).pack(side="left", padx=5)
+        tk.Button(panel, text="Экспорт", command=self.export_file).pack(side="left", padx=5)
         tk.Button(panel, text="Статистика", command=self.stats).pack(side="right", padx=5)
 
         self.refresh()
 
+        prewarm(self.root, ("numpy", "matplotlib.figure", "matplotlib.backends.backend_tkagg"),
+                PREWARM_DELAY_MS)
+
     def load(self):
-        if os.path.exists(DB_FILE):
-            try:
-                with open(DB_FILE, "r", encoding="utf-8") as f:
-                    raw = json.load(f)
-                    self.patients = [Patient(**p) for p in raw]
-            except:
-                self.patients = []
+        # Синхронно читается только первая страница, чтобы окно открылось сразу
+        self._load_started = time.perf_counter()
+        try:
+            with self.telemetry.timer("load_first_page"):
+                first_page = self.storage.load_page(FIRST_PAGE_SIZE)
+                upto_id = self.storage.max_id()
+        except sqlite3.Error as e:
+            messagebox.showerror("Ошибка", f"Не удалось загрузить пациентов: {e}")
+            first_page, upto_id = [], 0
+        self.patients = first_page
+        self.positions = {p.id: i for i, p in enumerate(self.patients)}
+        self.columns = PatientColumns()
+        self.columns.extend(self.patients)
+        self.index.build(self.patients)
+
+        if first_page and first_page[-1].id < upto_id:
+            self.loader = BackgroundLoader(self.storage.path, first_page, first_page[-1].id,
+                                           upto_id, self.index.get_patient)
+            self.loader.start()
+            self.root.after(LOAD_POLL_MS, self._poll_loader)
+
+    def _poll_loader(self):
+        # Одна пачка за тик, чтобы интерфейс не подвисал
+        try:
+            kind, payload = self.loader.queue.get_nowait()
+        except queue.Empty:
+            kind, payload = None, None
+
+        if kind == "chunk":
+            for p in payload:
+                self.positions[p.id] = len(self.patients)
+                self.patients.append(p)
+            self.columns.extend(payload)
+        elif kind == "index":
+            self._finish_loading(payload)
+            return
+        elif kind == "error":
+            messagebox.showerror("Ошибка", f"Не удалось загрузить пациентов: {payload}")
+            self._finish_loading(None)
+            return
+        self.search_status.config(text=f"Загрузка: {len(self.patients)}", fg="gray")
+        self.refresh()
+        self.root.after(LOAD_POLL_MS, self._poll_loader)
+
+    def _finish_loading(self, index: Optional[PatientIndex]):
+        self.loader = None
+        self.telemetry.record("load_all", time.perf_counter() - self._load_started)
+        self.telemetry.count("patients_loaded", len(self.patients))
+        if index is None:
+            # Индексы строятся по текущему списку, в котором правки уже есть
+            self._pending_index_ops.clear()
+            self.index.build(self.patients)
+        else:
+            self.index = index
+            # Правки, сделанные во время загрузки, применяются к готовым индексам
+            for old, new in self._pending_index_ops:
+                self._index_update(old, new)
+            self._pending_index_ops.clear()
+        self._apply_view()
+        self.refresh()
 
-    def save(self):
-        with open(DB_FILE, "w", encoding="utf-8") as f:
-            json.dump([p.__dict__ for p in self.patients], f, ensure_ascii=False, indent=4)
+    def _index_update(self, old: Optional[Patient], new: Patient):
+        if self.loader is not None:
+            self._pending_index_ops.append((old, new))
+        elif old is None:
+            self.index.add(new)
+        else:
+            self.index.replace(old, new)
+
+    def save(self, patient: Patient):
+        # Пишется только изменённая строка, а не вся база
+        with self.telemetry.timer("save"):
+            if patient.id is None:
+                self.storage.add(patient)
+            else:
+                self.storage.update(patient)
+        self.telemetry.count("saves")
+
+    def close(self):
+        self.storage.close()
+        self.root.destroy()
+
+    @staticmethod
+    def _row(p: Patient):
+        return str(p.id), (str(p.fio), str(p.age), str(p.sex),
+                           str(p.height), str(p.weight), str(p.bmi))
+
+    def _row_count(self):
+        return len(self.patients) if self.view is None else len(self.view)
+
+    def _fetch_rows(self, start, stop):
+        if self.view is None:
+            return [self._row(p) for p in self.patients[start:stop]]
+        return [self._row(self.patients[self.positions[pid]]) for pid in self.view[start:stop]]
 
     def refresh(self):
-        for row in self.sheet.get_children():
-            self.sheet.delete(row)
+        # Перерисовывается только видимое окно таблицы
+        self.sheet.refresh()
 
-        for p in self.patients:
-            self.sheet.insert("", "end",
-                              values=(str(p.fio), str(p.age), str(p.sex), 
-                                      str(p.height), str(p.weight), str(p.bmi)))
+    def _apply_view(self):
+        if self.loader is not None:
+            # Поиск и сортировка применятся, когда индексы будут построены
+            self.view = None
+            return
+        found = self.index.search(self.conditions)
+        if found is None:
+            self.view = (self.index.view(self.sort_column, self.sort_reverse)
+                         if self.sort_column else None)
+            self.search_status.config(text="", fg="black")
+        else:
+            self.view = (self.index.sort_ids(found, self.sort_column, self.sort_reverse)
+                         if self.sort_column else found)
+            self.search_status.config(text=f"Найдено: {len(found)}", fg="black")
+            selected = self.sheet.selection()
+            if selected is not None and int(selected) not in found:
+                # Скрытую поиском строку нельзя редактировать
+                self.sheet.clear_selection()
+
+    def _schedule_search(self):
+        # Поиск запускается после паузы в наборе, а не на каждую клавишу
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(200, self.search)
+
+    def search(self):
+        self._search_job = None
+        try:
+            self.conditions = parse_query(self.search_var.get())
+        except ValueError as e:
+            self.search_status.config(text=str(e), fg="red")
+            return
+        with self.telemetry.timer("search"):
+            self._apply_view()
+        self.sheet.first = 0
+        self.refresh()
+
+    def sort_by(self, column):
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column, self.sort_reverse = column, False
+        for col in self.sheet.tree["columns"]:
+            arrow = (" ▼" if self.sort_reverse else " ▲") if col == column else ""
+            self.sheet.tree.heading(col, text=col + arrow)
+        self._apply_view()
+        self.sheet.first = 0
+        self.refresh()
 
     def add(self):
         def callback(new_patient):
+            self.save(new_patient)
+            self.positions[new_patient.id] = len(self.patients)
             self.patients.append(new_patient)
-            self.save()
-            self.refresh()
+            self.columns.append(new_patient)
+            self._index_update(None, new_patient)
+            if self.view is None:
+                self.sheet.see(len(self.patients) - 1)
+            else:
+                self._apply_view()
+                self.refresh()
 
         PatientForm(self.root, callback, None) 
 
@@ -143,69 +425,84 @@ class PatientApp:
         if not selected:
             return
 
-        idx = self.sheet.index(selected[0])
+        idx = self.positions[int(selected)]
         old_patient = self.patients[idx]
 
         def callback(updated):
+            updated.id = old_patient.id
+            self.save(updated)
             self.patients[idx] = updated
-            self.save()
-            self.refresh()
+            self.columns.replace(idx, updated)
+            self._index_update(old_patient, updated)
+            if self.view is None:
+                self.sheet.update_row(*self._row(updated))
+            else:
+                # Правка могла изменить порядок сортировки или результат поиска
+                self._apply_view()
+                self.refresh()
 
         PatientForm(self.root, callback, old_patient)
 
+    def import_file(self):
+        if self.loader is not None:
+            messagebox.showinfo("Импорт", "Дождитесь окончания загрузки базы")
+            return
+        path = filedialog.askopenfilename(
+            filetypes=[("CSV / JSON", "*.csv *.jsonl *.ndjson *.json")]
+        )
+        if not path:
+            return
+
+        def on_chunk(patients):
+            for p in patients:
+                self.positions[p.id] = len(self.patients)
+                self.patients.append(p)
+            self.columns.extend(patients)
+            self.search_status.config(text=f"Импорт: {len(self.patients)}", fg="black")
+            self.root.update_idletasks()
+
+        try:
+            with self.telemetry.timer("import"):
+                report = bulk.import_patients(path, self.storage, on_chunk=on_chunk)
+            self.telemetry.count("imported", report.imported)
+        except (OSError, ValueError, csv.Error, sqlite3.Error) as e:
+            messagebox.showerror("Ошибка", f"Импорт прерван: {e}")
+            report = None
+        finally:
+            # Индексы проще один раз перестроить, чем вставлять по одному
+            self.index.build(self.patients)
+            self._apply_view()
+            self.refresh()
+
+        if report:
+            text = f"Импортировано: {report.imported}\nОтклонено: {report.rejected}"
+            if report.rejects_path:
+                text += f"\nПричины отказа: {report.rejects_path}"
+            messagebox.showinfo("Импорт", text)
+
+    def export_file(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("JSON", "*.json")]
+        )
+        if not path:
+            return
+        try:
+            count = bulk.export_patients(path, self.storage)
+        except (OSError, sqlite3.Error) as e:
+            messagebox.showerror("Ошибка", f"Экспорт не удался: {e}")
+            return
+        messagebox.showinfo("Экспорт", f"Выгружено пациентов: {count}")
+
     def stats(self):
         if not self.patients:
             messagebox.showinfo("Нет данных", "Пациентов нет")
             return
 
-        ages = [p.age for p in self.patients]
-        sexes = [p.sex for p in self.patients]
-        bmis = [p.bmi for p in self.patients]
-
-        ages_array = np.array(ages)
-        sexes_array = np.array(sexes)
-        bmis_array = np.array(bmis)
-
-        plt.figure(figsize=(12, 8))
-
-        # График 1: Распределение пациентов по полу
-        plt.subplot(2, 2, 1)
-        plt.title("Распределение пациентов по полу")
-        plt.xlabel("Пол")
-        plt.ylabel("Количество")
-        
-        male_count = np.sum(sexes_array == "М")
-        female_count = np.sum(sexes_array == "Ж")
-        
-        plt.bar(["Мужчины", "Женщины"], [male_count, female_count], color=["blue", "pink"])
-        plt.grid(True, axis='y')
-
-        # График 2: Распределение возраста пациентов
-        plt.subplot(2, 2, 2)
-        plt.title("Распределение возраста пациентов")
-        plt.xlabel("Возраст")
-        plt.ylabel("Количество")
-        plt.hist(ages_array, bins=10, color="orange", edgecolor="black")
-        plt.grid(True)
-
-        # График 3: Распределение ИМТ пациентов
-        plt.subplot(2, 2, 3)
-        plt.title("Распределение ИМТ пациентов")
-        plt.xlabel("ИМТ")
-        plt.ylabel("Количество")
-        plt.hist(bmis_array, bins=10, color="green", edgecolor="black")
-        plt.grid(True)
-
-        # График 4: Зависимость ИМТ от возраста
-        plt.subplot(2, 2, 4)
-        plt.title("Зависимость ИМТ от возраста")
-        plt.xlabel("Возраст")
-        plt.ylabel("ИМТ")
-        plt.scatter(ages_array, bmis_array, color="red")
-        plt.grid(True)
-
-        plt.tight_layout()
-        plt.show()
+        # Окно статистики переиспользуется, пока данные не изменились
+        if self.stats_window is None:
+            self.stats_window = StatsWindow(self.root, telemetry=self.telemetry)
+        self.stats_window.show(self.columns)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+from patient import Patient
+
+DB_FILE = "patients.db"
+LEGACY_JSON_FILE = "patients.json"
+
+_FIELDS = ("fio", "age", "sex", "height", "weight", "bmi")
+
+
+class PatientStorage(ABC):
+    """
+    Хранилище пациентов.
+
+    Каждое изменение записывается отдельной операцией, поэтому стоимость
+    сохранения не зависит от общего числа пациентов.
+    """
+
+    @abstractmethod
+    def load_all(self) -> list[Patient]:
+        """Возвращает всех пациентов в порядке добавления."""
+
+    @abstractmethod
+    def add(self, patient: Patient) -> Patient:
+        """Сохраняет нового пациента и проставляет ему id."""
+
+    @abstractmethod
+    def update(self, patient: Patient):
+        """Перезаписывает пациента с тем же id."""
+
+    def add_many(self, patients: list[Patient]) -> list[Patient]:
+        """Сохраняет пачку новых пациентов."""
+        return [self.add(p) for p in patients]
+
+    def load_page(self, limit: int) -> list[Patient]:
+        """Первые limit пациентов в порядке добавления."""
+        return self.load_all()[:limit]
+
+    def max_id(self) -> int:
+        """Наибольший id среди сохранённых пациентов (0, если их нет)."""
+        return max((p.id for p in self.load_all()), default=0)
+
+    def iter_chunks(self, size: int, after_id: int = 0,
+                    upto_id: int | None = None) -> Iterator[list[Patient]]:
+        """Отдаёт пациентов с after_id < id <= upto_id пачками в порядке добавления."""
+        patients = [p for p in self.load_all()
+                    if p.id > after_id and (upto_id is None or p.id <= upto_id)]
+        for i in range(0, len(patients), size):
+            yield patients[i:i + size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SQLiteStorage(PatientStorage):
+    """
+    Хранилище на встроенной SQLite.
+
+    Каждая вставка и правка — одна транзакция на одну строку; при сбое во время
+    записи база откатывается к последнему подтверждённому состоянию.
+    При первом запуске данные однократно переносятся из старого patients.json.
+    """
+
+    def __init__(self, path: str = DB_FILE, legacy_json: str | None = LEGACY_JSON_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        # WAL + NORMAL: запись без полного fsync, но без риска повредить базу
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS patients ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "fio TEXT NOT NULL, age INTEGER NOT NULL, sex TEXT NOT NULL, "
+                "height REAL NOT NULL, weight REAL NOT NULL, bmi REAL NOT NULL)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+        if legacy_json:
+            self._migrate_json(legacy_json)
+
+    def _migrate_json(self, json_path: str):
+        done = self.conn.execute(
+            "SELECT 1 FROM meta WHERE key = 'json_migrated'"
+        ).fetchone()
+        if done or not os.path.exists(json_path):
+            return
+
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            rows = [tuple(p[k] for k in _FIELDS) for p in raw]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Не удалось перенести данные из {json_path}: {e}") from e
+
+        # Перенос и отметка о нём — в одной транзакции
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO patients (fio, age, sex, height, weight, bmi) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('json_migrated', ?)", (json_path,)
+            )
+
+    def load_all(self) -> list[Patient]:
+        cursor = self.conn.execute(
+            "SELECT id, fio, age, sex, height, weight, bmi FROM patients ORDER BY id"
+        )
+        return [Patient(fio, age, sex, height, weight, bmi, id=pid)
+                for pid, fio, age, sex, height, weight, bmi in cursor]
+
+    def add(self, patient: Patient) -> Patient:
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO patients (fio, age, sex, height, weight, bmi) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                tuple(getattr(patient, k) for k in _FIELDS),
+            )
+        patient.id = cursor.lastrowid
+        return patient
+
+    def add_many(self, patients: list[Patient]) -> list[Patient]:
+        # Вся пачка — одна транзакция; id проставляются только после её фиксации
+        ids = []
+        with self.conn:
+            for patient in patients:
+                cursor = self.conn.execute(
+                    "INSERT INTO patients (fio, age, sex, height, weight, bmi) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    tuple(getattr(patient, k) for k in _FIELDS),
+                )
+                ids.append(cursor.lastrowid)
+        for patient, pid in zip(patients, ids):
+            patient.id = pid
+        return patients
+
+    def load_page(self, limit: int) -> list[Patient]:
+        cursor = self.conn.execute(
+            "SELECT id, fio, age, sex, height, weight, bmi FROM patients ORDER BY id LIMIT ?",
+            (limit,),
+        )
+        return [Patient(fio, age, sex, height, weight, bmi, id=pid)
+                for pid, fio, age, sex, height, weight, bmi in cursor]
+
+    def max_id(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM patients").fetchone()[0]
+
+    def iter_chunks(self, size: int, after_id: int = 0,
+                    upto_id: int | None = None) -> Iterator[list[Patient]]:
+        if upto_id is None:
+            upto_id = self.max_id()
+        cursor = self.conn.execute(
+            "SELECT id, fio, age, sex, height, weight, bmi FROM patients "
+            "WHERE id > ? AND id <= ? ORDER BY id",
+            (after_id, upto_id),
+        )
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                break
+            yield [Patient(fio, age, sex, height, weight, bmi, id=pid)
+                   for pid, fio, age, sex, height, weight, bmi in rows]
+
+    def update(self, patient: Patient):
+        if patient.id is None:
+            raise ValueError("Пациент ещё не сохранён")
+        with self.conn:
+            self.conn.execute(
+                "UPDATE patients SET fio = ?, age = ?, sex = ?, height = ?, weight = ?, bmi = ? "
+                "WHERE id = ?",
+                (*(getattr(patient, k) for k in _FIELDS), patient.id),
+            )
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
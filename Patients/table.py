@@ -0,0 +1,147 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Optional, Sequence
+
+# Строка таблицы: (iid, значения колонок)
+Row = tuple[str, Sequence]
+
+
+class VirtualTable(tk.Frame):
+    """
+    Таблица, в которой в Treeview существуют только видимые строки.
+
+    Данные не хранятся внутри виджета: таблица запрашивает у источника
+    число строк (count) и срез строк для текущего окна (fetch). Строки имеют
+    постоянные iid, поэтому при прокрутке и обновлении меняются только
+    те элементы, которые реально появились, исчезли или изменились.
+    Стоимость отрисовки зависит от высоты окна, а не от числа записей.
+    """
+
+    def __init__(self, master, columns: Sequence[str],
+                 count: Callable[[], int],
+                 fetch: Callable[[int, int], list[Row]]):
+        super().__init__(master)
+        self.count = count
+        self.fetch = fetch
+        self.first = 0
+        self.visible = 1
+        self._selected: Optional[str] = None
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", selectmode="browse")
+        self.scroll = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scroll.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        rowheight = ttk.Style().lookup("Treeview", "rowheight")
+        self.rowheight = int(rowheight) if rowheight else 20
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(3))
+        self.tree.bind("<Prior>", lambda e: self.scroll_by(-self.visible))
+        self.tree.bind("<Next>", lambda e: self.scroll_by(self.visible))
+        # В Treeview только видимые строки, поэтому переход за край окна
+        # выполняется здесь, а не стандартными привязками виджета
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Home>", lambda e: self._select_index(0))
+        self.tree.bind("<End>", lambda e: self._select_index(self.count() - 1))
+
+    def refresh(self):
+        """Перерисовывает видимое окно, трогая только изменившиеся строки."""
+        total = self.count()
+        self.first = max(0, min(self.first, total - self.visible))
+        rows = self.fetch(self.first, min(total, self.first + self.visible))
+
+        wanted = {iid for iid, _ in rows}
+        current = self.tree.get_children()
+        stale = [iid for iid in current if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+
+        existing = set(current).difference(stale)
+        for pos, (iid, values) in enumerate(rows):
+            if iid in existing:
+                self.tree.item(iid, values=values)
+                if self.tree.index(iid) != pos:
+                    self.tree.move(iid, "", pos)
+            else:
+                self.tree.insert("", pos, iid=iid, values=values)
+
+        if self._selected in wanted and self._selected not in self.tree.selection():
+            self.tree.selection_set(self._selected)
+
+        if total:
+            self.scroll.set(self.first / total, min(1.0, (self.first + self.visible) / total))
+        else:
+            self.scroll.set(0.0, 1.0)
+
+    def update_row(self, iid: str, values: Sequence):
+        """Обновляет одну строку, если она сейчас на экране."""
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=values)
+
+    def see(self, index: int):
+        """Прокручивает таблицу так, чтобы строка с номером index была видна."""
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + self.visible:
+            self.first = index - self.visible + 1
+        self.refresh()
+
+    def selection(self) -> Optional[str]:
+        """iid выбранной строки (даже если она прокручена за пределы окна)."""
+        return self._selected
+
+    def clear_selection(self):
+        self._selected = None
+        self.tree.selection_remove(*self.tree.selection())
+
+    def scroll_by(self, rows: int):
+        self.first += rows
+        self.refresh()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.first = int(float(value) * self.count())
+            self.refresh()
+        elif action == "scroll":
+            step = self.visible if unit == "pages" else 1
+            self.scroll_by(int(value) * step)
+
+    def _on_wheel(self, event):
+        self.scroll_by(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event):
+        # Заголовок занимает примерно одну строку
+        visible = max(1, event.height // self.rowheight - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.refresh()
+
+    def _move_selection(self, step: int):
+        if self._selected is not None and self.tree.exists(self._selected):
+            self._select_index(self.first + self.tree.index(self._selected) + step)
+        else:
+            # Выбранная строка за пределами окна: начинаем с края видимой части
+            self._select_index(self.first if step > 0 else self.first + self.visible - 1)
+        return "break"
+
+    def _select_index(self, index: int):
+        total = self.count()
+        if not total:
+            return "break"
+        index = max(0, min(index, total - 1))
+        self.see(index)
+        iid = self.tree.get_children()[index - self.first]
+        self._selected = iid
+        self.tree.selection_set(iid)
+        self.tree.focus(iid)
+        return "break"
+
+    def _on_select(self, event):
+        selected = self.tree.selection()
+        if selected:
+            self._selected = selected[0]
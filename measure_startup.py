@@ -0,0 +1,167 @@
+"""
+Замер времени запуска всех трёх программ.
+
+Для каждой точки входа в отдельных процессах измеряются (медиана по нескольким
+запускам, первый прогон для компиляции .pyc отбрасывается):
+
+    импорт — суммарное время импорта модуля под `python -X importtime`;
+    окно   — от начала импорта до первой отрисовки окна: импорт, Tk(),
+             конструктор приложения (в том числе запуск процесса-вычислителя
+             калькулятора) и root.update(). Требует дисплея; без него
+             колонка остаётся пустой. Программы запускаются в пустом
+             временном каталоге, поэтому учёт пациентов стартует с пустой базой.
+
+С флагом --baseline то же самое измеряется для указанной git-ревизии. Сравнивать
+стоит с ревизией до начала оптимизаций, а не с предыдущим коммитом, иначе
+замедления из промежуточных коммитов не видны:
+
+    python measure_startup.py --baseline $(git rev-list --max-parents=0 HEAD)
+    python measure_startup.py --baseline <коммит> -o startup.json
+
+В колонке "тяжёлые" перечислены загруженные при импорте numpy/matplotlib.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Каталог программы -> (модуль точки входа, класс приложения)
+ENTRY_POINTS = {
+    "Calculator": ("Calculator_pro", "Calculator"),
+    "Fastq": ("FastQ_graphs", "FastQCApp"),
+    "Patients": ("stats_patients", "PatientApp"),
+}
+HEAVY_MODULES = ("numpy", "matplotlib")
+REPEAT = 5
+
+_IMPORT_LINE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+_WINDOW_CODE = """\
+import sys, time
+sys.path.insert(0, {directory!r})
+started = time.perf_counter()
+import tkinter as tk
+import {module}
+root = tk.Tk()
+app = {module}.{app}(root)
+root.update()
+print("window_ms", (time.perf_counter() - started) * 1000, flush=True)
+getattr(app, "close", root.destroy)()
+"""
+
+
+def _import_once(directory: str, module: str) -> tuple[float, list[str]]:
+    """Время импорта модуля в мс и список загруженных тяжёлых пакетов."""
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=directory,
+                          capture_output=True, text=True, check=True)
+    total_us = None
+    for line in proc.stderr.splitlines():
+        m = _IMPORT_LINE.match(line)
+        if m and m.group(4) == module and len(m.group(3)) == 1:
+            total_us = int(m.group(2))
+    if total_us is None:
+        raise RuntimeError(f"Не удалось найти время импорта {module}:\n{proc.stderr[-2000:]}")
+    heavy = [name for name in proc.stdout.strip().split(",") if name]
+    return total_us / 1000, heavy
+
+
+def _window_once(directory: str, module: str, app: str) -> float:
+    """Время от начала импорта до первой отрисовки окна в мс."""
+    code = _WINDOW_CODE.format(directory=directory, module=module, app=app)
+    env = {name: value for name, value in os.environ.items() if name != "GUI_TELEMETRY"}
+    with tempfile.TemporaryDirectory() as cwd:
+        proc = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env,
+                              capture_output=True, text=True, check=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith("window_ms "):
+            return float(line.split()[1])
+    raise RuntimeError(f"Окно {module} не открылось:\n{proc.stderr[-2000:]}")
+
+
+def has_display() -> bool:
+    proc = subprocess.run([sys.executable, "-c", "import tkinter; tkinter.Tk().destroy()"],
+                          capture_output=True)
+    return proc.returncode == 0
+
+
+def _median(measure, repeat: int) -> float:
+    measure()  # прогрев: компиляция .pyc, дисковый кэш
+    return round(statistics.median(measure() for _ in range(repeat)), 1)
+
+
+def measure_tree(root: str, repeat: int = REPEAT, window: bool = True) -> dict:
+    results = {}
+    for directory, (module, app) in ENTRY_POINTS.items():
+        path = os.path.join(root, directory)
+        if not os.path.exists(os.path.join(path, module + ".py")):
+            continue
+        heavy = _import_once(path, module)[1]
+        results[module] = {
+            "import_ms": _median(lambda: _import_once(path, module)[0], repeat),
+            "window_ms": _median(lambda: _window_once(path, module, app), repeat) if window else None,
+            "heavy": heavy,
+        }
+    return results
+
+
+def checkout(revision: str, target: str):
+    """Распаковывает ревизию git во временный каталог (с общими модулями в корне)."""
+    archive = os.path.join(target, "tree.tar")
+    subprocess.run(["git", "archive", "-o", archive, revision], cwd=ROOT, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(target)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер времени запуска программ")
+    parser.add_argument("--baseline", help="git-ревизия для сравнения (до оптимизаций)")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("-o", "--output", help="файл для результатов JSON")
+    args = parser.parse_args()
+
+    window = has_display()
+    if not window:
+        print("Нет дисплея: время до показа окна не измеряется "
+              "(запустите, например, через xvfb-run)", file=sys.stderr)
+
+    report = {"python": sys.version.split()[0], "current": measure_tree(ROOT, args.repeat, window)}
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as tmp:
+            checkout(args.baseline, tmp)
+            report["baseline"] = measure_tree(tmp, args.repeat, window)
+        report["baseline_revision"] = args.baseline
+
+    print(f"{'модуль':<16}{'импорт, мс':>24}{'окно, мс':>24}  тяжёлые (было -> стало)")
+    for module, current in report["current"].items():
+        base = report.get("baseline", {}).get(module)
+        columns = [_compare(base and base[key], current[key]) for key in ("import_ms", "window_ms")]
+        heavy = ",".join(current["heavy"]) or "нет"
+        if base:
+            heavy = f"{','.join(base['heavy']) or 'нет'} -> {heavy}"
+        print(f"{module:<16}{columns[0]:>24}{columns[1]:>24}  {heavy}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def _compare(before: float | None, after: float | None) -> str:
+    # "было -> стало (×ускорение)"; ×0.5 означает замедление вдвое
+    if after is None:
+        return "—"
+    if before is None:
+        return f"{after:.1f}"
+    return f"{before:.1f} -> {after:.1f} (×{before / after:.1f})"
+
+
+if __name__ == "__main__":
+    main()
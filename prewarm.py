@@ -0,0 +1,33 @@
+"""
+Фоновая предзагрузка тяжёлых библиотек после показа окна.
+
+matplotlib и numpy импортируются программами только при первом построении
+графиков, чтобы окно открывалось быстрее. Чтобы первый график потом не ждал
+импорта, эти модули заранее загружаются в фоновом потоке через delay_ms после
+запуска главного цикла. Переменная окружения GUI_PREWARM=0 отключает предзагрузку.
+"""
+import importlib
+import os
+import threading
+
+ENV_PREWARM = "GUI_PREWARM"
+
+
+def prewarm(root, modules: tuple[str, ...], delay_ms: int):
+    """
+    Планирует импорт модулей в фоновом потоке.
+
+    Args:
+        root: Окно Tk, через after() которого откладывается запуск.
+        modules (tuple[str, ...]): Имена модулей, например ("numpy", "matplotlib.pyplot").
+        delay_ms (int): Задержка после показа окна в миллисекундах.
+    """
+    if os.environ.get(ENV_PREWARM, "1") == "0":
+        return
+    root.after(delay_ms, lambda: threading.Thread(target=_import_all, args=(modules,),
+                                                  daemon=True).start())
+
+
+def _import_all(modules: tuple[str, ...]):
+    for name in modules:
+        importlib.import_module(name)
@@ -0,0 +1,207 @@
+"""
+Общая телеметрия для всех трёх программ: таймеры, счётчики и замеры памяти.
+
+По умолчанию выключена, и инструментированный код стоит одну проверку флага.
+Включается переменной окружения GUI_TELEMETRY с путём к файлу JSON Lines:
+раз в GUI_TELEMETRY_INTERVAL секунд (по умолчанию 60, не чаще раза в секунду)
+и при выходе из программы в файл дописывается строка с замерами, накопленными
+с прошлой выгрузки:
+
+    {"ts": "...", "app": "patients", "host": "...", "pid": 123,
+     "timers": {"save": {"count": 12, "mean": 0.0011, "p50": ..., "p95": ...,
+                         "max": ..., "samples": [...]}},
+     "counters": {"saves": 12}, "memory_mb": 84.2}
+
+Программы запускаются из своих каталогов, поэтому перед импортом корень
+репозитория добавляется в sys.path.
+"""
+import atexit
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ENV_PATH = "GUI_TELEMETRY"
+ENV_INTERVAL = "GUI_TELEMETRY_INTERVAL"
+EXPORT_INTERVAL_S = 60.0
+MIN_EXPORT_INTERVAL_S = 1.0  # чаще выгрузка только мешает записи замеров
+SAMPLES = 1024  # замеров на таймер между выгрузками, старые вытесняются
+
+_NULL_TIMER = nullcontext()
+
+
+def peak_rss_bytes() -> int | None:
+    """Пиковый RSS процесса за всё время работы в байтах; None, если недоступен."""
+    if resource is None:
+        return None
+    # ru_maxrss: килобайты в Linux, байты в macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def memory_mb() -> float | None:
+    """Текущий объём резидентной памяти процесса (или пиковый, если текущий недоступен)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    peak = peak_rss_bytes()
+    return None if peak is None else peak / 2**20
+
+
+def _env_interval() -> float:
+    # Некорректное значение GUI_TELEMETRY_INTERVAL не должно ронять программу
+    try:
+        interval = float(os.environ.get(ENV_INTERVAL, EXPORT_INTERVAL_S))
+    except ValueError:
+        return EXPORT_INTERVAL_S
+    if not math.isfinite(interval):
+        return EXPORT_INTERVAL_S
+    return max(MIN_EXPORT_INTERVAL_S, interval)
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Telemetry:
+    """
+    Сборщик замеров одной программы.
+
+    Длительности хранятся в кольцевых буферах (deque с maxlen) по имени
+    таймера, счётчики — в словаре. Запись потокобезопасна: замеры могут
+    приходить и из фоновых потоков, и из потока выгрузки.
+
+    Attributes:
+        app (str): Имя программы в выгружаемых записях.
+        enabled (bool): Собираются ли замеры.
+        export_path (str or None): Файл JSON Lines для периодической выгрузки.
+    """
+
+    def __init__(self, app: str, enabled: bool = False, export_path: str | None = None,
+                 interval: float = EXPORT_INTERVAL_S, samples: int = SAMPLES):
+        self.app = app
+        self.enabled = enabled
+        self.export_path = export_path
+        self.interval = interval
+        self.samples = samples
+        self.timers: dict[str, deque] = {}
+        self.seen: dict[str, int] = {}
+        self.counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_env(cls, app: str) -> "Telemetry":
+        """Включённая с выгрузкой, если задан GUI_TELEMETRY; иначе выключенная."""
+        path = os.environ.get(ENV_PATH)
+        if not path:
+            return cls(app)
+        telemetry = cls(app, enabled=True, export_path=path, interval=_env_interval())
+        telemetry.start_export()
+        return telemetry
+
+    def record(self, name: str, seconds: float):
+        """Добавляет замер длительности."""
+        if not self.enabled:
+            return
+        with self._lock:
+            buffer = self.timers.get(name)
+            if buffer is None:
+                buffer = self.timers[name] = deque(maxlen=self.samples)
+            buffer.append(seconds)
+            self.seen[name] = self.seen.get(name, 0) + 1
+
+    def count(self, name: str, n: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def timer(self, name: str):
+        """Контекстный менеджер, замеряющий блок кода; выключенный ничего не делает."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._timer(name)
+
+    @contextmanager
+    def _timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def snapshot(self, drain: bool = False) -> dict:
+        """
+        Сводка по накопленным замерам.
+
+        Args:
+            drain (bool): Очистить буферы и счётчики (так делает выгрузка).
+        """
+        with self._lock:
+            timers = {name: list(buffer) for name, buffer in self.timers.items()}
+            seen, counters = dict(self.seen), dict(self.counters)
+            if drain:
+                self.timers.clear()
+                self.seen.clear()
+                self.counters.clear()
+
+        stats = {}
+        for name, samples in timers.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            stats[name] = {
+                "count": seen.get(name, len(samples)),
+                "mean": sum(samples) / len(samples),
+                "p50": _percentile(ordered, 0.5),
+                "p95": _percentile(ordered, 0.95),
+                "max": ordered[-1],
+                "samples": samples,
+            }
+        return {"timers": stats, "counters": counters, "memory_mb": memory_mb()}
+
+    def flush(self):
+        """Дописывает в export_path строку с замерами с прошлой выгрузки."""
+        import platform
+
+        if not self.export_path:
+            return
+        data = self.snapshot(drain=True)
+        if not data["timers"] and not data["counters"]:
+            return
+        record = {"ts": time.strftime("%Y-%m-%dT%H:%M:%S"), "app": self.app,
+                  "host": platform.node(), "pid": os.getpid(), **data}
+        try:
+            with open(self.export_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            pass  # телеметрия не должна ронять программу
+
+    def start_export(self):
+        """Запускает фоновую выгрузку раз в interval секунд и при выходе из программы."""
+        if self._thread is not None or not self.export_path:
+            return
+        self._thread = threading.Thread(target=self._export_loop, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+    def _export_loop(self):
+        while not self._stop.wait(self.interval):
+            self.flush()